@@ -1,7 +1,9 @@
 import os
+import sys
 from pinecone import Pinecone
 from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
+from utils.retriever import export_pinecone_index
 
 # === CONFIGURATION ===
 load_dotenv()
@@ -44,6 +46,13 @@ def query_pinecone(query_text, top_k=5, namespace=None):
 
 # === Entry Point ===
 if __name__ == "__main__":
+    # Usage: python "Pinecone data fetcher.py" --export-local <dir>
+    # Copies the index into a local vector index usable offline (RETRIEVER_BACKEND=local)
+    if len(sys.argv) == 3 and sys.argv[1] == "--export-local":
+        local_index = export_pinecone_index(index, sys.argv[2])
+        print(f"Exported {local_index.count} vectors to {sys.argv[2]}")
+        sys.exit(0)
+
     while True:
         query_input = input("\nEnter your medical question (or 'exit' to quit): ")
         if query_input.lower() == "exit":
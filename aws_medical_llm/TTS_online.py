@@ -1,20 +1,28 @@
-import boto3
 from pydub import AudioSegment
 from pydub.playback import play
 import io
+from utils.tts_pipeline import split_sentences, ordered_pipeline
+from utils.tts_cache import cached_synthesis
+from utils.aws import get_client
 
 def play_speech(text, voice_id="Aditi", region="us-east-1"):
-    polly = boto3.client("polly", region_name=region)
+    polly = get_client("polly", region_name=region)
 
-    response = polly.synthesize_speech(
-        Text=text,
-        OutputFormat="mp3",
-        VoiceId=voice_id
-    )
+    def polly_synthesize(chunk):
+        response = polly.synthesize_speech(
+            Text=chunk,
+            OutputFormat="mp3",
+            VoiceId=voice_id
+        )
+        return response["AudioStream"].read()
 
-    audio_stream = response["AudioStream"].read()
-    audio = AudioSegment.from_file(io.BytesIO(audio_stream), format="mp3")
-    play(audio)
+    def synthesize(chunk):
+        return cached_synthesis(chunk, voice_id, "polly", "mp3", polly_synthesize)
+
+    # Later sentences are synthesized concurrently while earlier ones play
+    for audio_stream in ordered_pipeline(split_sentences(text), synthesize):
+        audio = AudioSegment.from_file(io.BytesIO(audio_stream), format="mp3")
+        play(audio)
 
 if __name__ == "__main__":
     print("Playing English...")
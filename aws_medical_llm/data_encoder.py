@@ -1,25 +1,36 @@
 import os
+import logging
 from datasets import load_dataset
 from sentence_transformers import SentenceTransformer
-import pinecone
+from pinecone import Pinecone, ServerlessSpec
+from utils.ingest import ingest, Manifest, PineconeSink, LocalIndexSink
 HF_TOKEN = os.getenv('HF_TOKEN') 
 PINECONE_API_KEY = os.getenv('PINECONE_API_KEY') 
 PINECONE_ENV = 'us-east-1'
 INDEX_NAME = 'medical-demo'
-pinecone.init(api_key=PINECONE_API_KEY, environment=PINECONE_ENV)
-if INDEX_NAME not in pinecone.list_indexes():
-    pinecone.create_index(INDEX_NAME, dimension=384, metric='cosine')
-index = pinecone.Index(INDEX_NAME)
-pubmed_ds = load_dataset('qiaojin/PubMedQA', 'pqa_labeled', use_auth_token=HF_TOKEN)['train']
-ehrsql_ds = load_dataset('nannullna/ehrsql_mimic_iii', use_auth_token=HF_TOKEN)['train']
-model = SentenceTransformer('all-MiniLM-L6-v2')
+INGEST_BACKEND = os.getenv('INGEST_BACKEND', 'pinecone')  # "pinecone" or "local"
+LOCAL_INDEX_DIR = os.getenv('LOCAL_INDEX_DIR', 'vector_index')
+INGEST_LIMIT = int(os.getenv('INGEST_LIMIT')) if os.getenv('INGEST_LIMIT') else None  # rows per dataset, None for all
+# Content hashes of everything already ingested, so re-runs only embed new or changed rows
+MANIFEST_PATH = os.getenv('INGEST_MANIFEST', f'ingest_manifest_{INGEST_BACKEND}.db')
+logging.basicConfig(level=logging.INFO)
 
-def upload_to_pinecone(data, prefix, text_fn, meta_fn):
-    for i, row in enumerate(data[:100]):
-        text = text_fn(row)
-        embedding = model.encode(text)
-        meta = meta_fn(row)
-        index.upsert([(f'{prefix}-{i}', embedding.tolist(), meta)])
-upload_to_pinecone(pubmed_ds, prefix='pubmedqa', text_fn=lambda r: f"{r['question']} {r['context']} {r['long_answer']}", meta_fn=lambda r: {'source': 'pubmedqa', 'label': r['final_decision']})
-upload_to_pinecone(ehrsql_ds, prefix='ehrsql', text_fn=lambda r: f"{r['question']} {r['sql_query']}", meta_fn=lambda r: {'source': 'ehrsql', 'sql_query': r['sql_query']})
-print('✅ Uploaded 100 samples each from PubMedQA and EHRSQL to Pinecone.')
\ No newline at end of file
+def get_sink():
+    if INGEST_BACKEND == 'local':
+        return LocalIndexSink(LOCAL_INDEX_DIR)
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+    if INDEX_NAME not in pc.list_indexes().names():
+        pc.create_index(INDEX_NAME, dimension=384, metric='cosine', spec=ServerlessSpec(cloud='aws', region=PINECONE_ENV))
+    return PineconeSink(pc.Index(INDEX_NAME))
+
+if __name__ == '__main__':
+    pubmed_ds = load_dataset('qiaojin/PubMedQA', 'pqa_labeled', token=HF_TOKEN)['train']
+    ehrsql_ds = load_dataset('nannullna/ehrsql_mimic_iii', token=HF_TOKEN)['train']
+    model = SentenceTransformer('all-MiniLM-L6-v2')
+    sink = get_sink()
+    manifest = Manifest(MANIFEST_PATH)
+    # Retrieval reads the passage from metadata['text'], so it is stored alongside the labels
+    pubmed_count = ingest(pubmed_ds, 'pubmedqa', text_fn=lambda r: f"{r['question']} {r['context']} {r['long_answer']}", meta_fn=lambda r: {'source': 'pubmedqa', 'label': r['final_decision'], 'text': f"{r['question']} {r['long_answer']}"}, encoder=model, sink=sink, limit=INGEST_LIMIT, manifest=manifest, id_fn=lambda r: r['pubid'])
+    ehrsql_count = ingest(ehrsql_ds, 'ehrsql', text_fn=lambda r: f"{r['question']} {r['sql_query']}", meta_fn=lambda r: {'source': 'ehrsql', 'sql_query': r['sql_query'], 'text': r['question']}, encoder=model, sink=sink, limit=INGEST_LIMIT, manifest=manifest)
+    sink.finalize()
+    print(f'✅ Upserted {pubmed_count} new or changed PubMedQA and {ehrsql_count} EHRSQL rows to {INGEST_BACKEND}.')
@@ -1,9 +1,113 @@
+import os
+import time
+import threading
+from typing import List, Optional, Sequence
+import cv2
 import easyocr
 import torch
 
+OCR_LANGUAGES = [lang.strip() for lang in os.getenv("OCR_LANGUAGES", "en,hi").split(",") if lang.strip()]
+OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", "8"))
+
+class OCREngine:
+    def __init__(self, languages: Sequence[str] = OCR_LANGUAGES, gpu: Optional[bool] = None,
+                 batch_size: int = OCR_BATCH_SIZE):
+        """
+        Resident EasyOCR reader shared by all OCR requests
+
+        The detection and recognition networks are loaded once, on first use.
+        A reader is not safe to call from several threads, so calls are serialized.
+
+        Args:
+            languages: EasyOCR language codes
+            gpu: Use CUDA (None = use it if available)
+            batch_size: Recognition batch size
+        """
+        self.languages = list(languages)
+        self.gpu = torch.cuda.is_available() if gpu is None else gpu
+        self.batch_size = batch_size
+        self.reader = None
+        self._load_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._load_time = None
+        self._pages = 0
+
+    def load(self):
+        """Construct the EasyOCR reader once"""
+        if self.reader is not None:
+            return
+        with self._load_lock:
+            if self.reader is not None:
+                return
+            start_time = time.time()
+            self.reader = easyocr.Reader(self.languages, gpu=self.gpu)
+            self._load_time = time.time() - start_time
+            print(f'✅ EasyOCR reader {self.languages} ready in {self._load_time:.2f}s')
+
+    def read(self, image) -> str:
+        """Extract text from one image (path or array)"""
+        return self.read_pages([image])[0]
+
+    def read_pages(self, images: Sequence) -> List[str]:
+        """
+        Extract text from several pages, returning one string per page in order
+
+        Pages with the same dimensions are recognized together in one batched call.
+        """
+        self.load()
+        if len(images) == 1:
+            # A single page goes through the reader's own image loader
+            groups = {None: [0]}
+            pages = list(images)
+        else:
+            pages = [_load_rgb(image) if isinstance(image, str) else image for image in images]
+            groups = {}
+            for i, page in enumerate(pages):
+                groups.setdefault(page.shape, []).append(i)
+        texts = [""] * len(pages)
+        with self._read_lock:
+            for indexes in groups.values():
+                if len(indexes) == 1:
+                    results = [self.reader.readtext(pages[indexes[0]], detail=0, batch_size=self.batch_size)]
+                else:
+                    results = self.reader.readtext_batched([pages[i] for i in indexes], detail=0,
+                                                           batch_size=self.batch_size)
+                for i, lines in zip(indexes, results):
+                    texts[i] = "\n".join(lines)
+            self._pages += len(pages)
+        return texts
+
+    def stats(self) -> dict:
+        """Return load time and page count for monitoring"""
+        return {
+            "languages": self.languages,
+            "gpu": self.gpu,
+            "loaded": self.reader is not None,
+            "load_time_s": round(self._load_time, 3) if self._load_time is not None else None,
+            "pages": self._pages,
+        }
+
+def _load_rgb(image_path):
+    image = cv2.imread(image_path)
+    if image is None:
+        raise ValueError(f"Could not read image: {image_path}")
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+_ocr_engine = None
+_ocr_engine_lock = threading.Lock()
+
+def get_ocr_engine() -> OCREngine:
+    """Return the shared OCR engine, creating it on first call"""
+    global _ocr_engine
+    if _ocr_engine is None:
+        with _ocr_engine_lock:
+            if _ocr_engine is None:
+                _ocr_engine = OCREngine()
+    return _ocr_engine
+
 def extract_text_easyocr(image_path):
     """
-    Extract text from an image using EasyOCR with automatic GPU detection.
+    Extract text from an image using the shared EasyOCR reader.
     
     Args:
         image_path (str): Path to the image file.
@@ -11,12 +115,11 @@ def extract_text_easyocr(image_path):
     Returns:
         str: Extracted text from the image.
     """
-    use_gpu = torch.cuda.is_available()
-    reader = easyocr.Reader(['en', 'hi'], gpu=use_gpu)
-    
-    results = reader.readtext(image_path, detail=0)
-    extracted_text = "\n".join(results)
-    return extracted_text
+    return get_ocr_engine().read(image_path)
+
+def extract_pages_easyocr(image_paths):
+    """Extract text from several page images in one batched pass, one string per page"""
+    return get_ocr_engine().read_pages(image_paths)
 
 if __name__ == "__main__":
     image_path = r"C:/Users/prana/OneDrive - University of Maryland/Desktop/Internship and Part time/Hackathon/aws_medical_llm/Doctor-Note-Template-V02.jpg"
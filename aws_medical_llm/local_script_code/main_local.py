@@ -1,38 +1,56 @@
 import os
-from local_script_code.speech_to_text import transcribe_with_faster_whisper, download_model as download_whisper_model
-from local_script_code.medical_advisor_agent import download_model as download_biogpt_model, BioGPTChat
-from local_script_code.text_to_speech import speak_text
-from local_script_code.local_ocr import extract_text_easyocr
+from local_script_code.model_registry import get_biogpt_pool, get_whisper_engine, WHISPER_NUM_WORKERS
+from local_script_code.text_to_speech import speak_text, stream_pcm16
+from local_script_code.local_ocr import extract_text_easyocr, extract_pages_easyocr
+from utils.transcription import PARALLEL_STT_WORKERS
 HUGGINGFACE_TOKEN = os.getenv("HF_TOKEN")
 WHISPER_MODEL_REPO = 'Systran/faster-whisper-base.en'
+# One resident engine serves every STT path, with enough workers for chunked transcription
+WHISPER_ENGINE_WORKERS = max(WHISPER_NUM_WORKERS, PARALLEL_STT_WORKERS)
 
-def run_stt(audio_input_path: str):
-    print('⬇️ Downloading Whisper model for STT...')
-    whisper_model_path = download_whisper_model(WHISPER_MODEL_REPO, HUGGINGFACE_TOKEN)
-    print(f'🎧 Transcribing audio from: {audio_input_path}')
-    transcript = transcribe_with_faster_whisper(audio_input_path, whisper_model_path)
+def run_stt(audio_input):
+    """Transcribe an audio file path or a 16 kHz mono float32 NumPy array"""
+    engine = get_whisper_engine(WHISPER_MODEL_REPO, num_workers=WHISPER_ENGINE_WORKERS, token=HUGGINGFACE_TOKEN)
+    if isinstance(audio_input, str):
+        print(f'🎧 Transcribing audio from: {audio_input}')
+    else:
+        print(f'🎧 Transcribing {len(audio_input) / 16000:.1f}s of in-memory audio')
+    transcript = engine.transcribe(audio_input)
     return transcript
 
+def run_stt_segments(audio_input, **kwargs):
+    """Transcribe audio into timestamped {"start", "end", "text"} segments"""
+    engine = get_whisper_engine(WHISPER_MODEL_REPO, num_workers=WHISPER_ENGINE_WORKERS, token=HUGGINGFACE_TOKEN)
+    return engine.transcribe_segments(audio_input, **kwargs)
+
 def run_llm(prompt_text: str):
-    print('🤖 Downloading/loading BioGPT model...')
-    model_path = download_biogpt_model()
-    print('🧬 Initializing BioGPTChat model instance...')
-    bio_gpt = BioGPTChat(model_path, n_ctx=2048)
     print('💬 Generating LLM response...')
-    response = bio_gpt.generate_response(prompt_text)
+    response = get_biogpt_pool().generate(prompt_text)
     return response
 
+def run_llm_stream(prompt_text: str):
+    print('💬 Streaming LLM response...')
+    return get_biogpt_pool().generate_stream(prompt_text)
+
 def run_tts(text_response: str):
     print('🔊 Synthesizing text to speech...')
     speak_text(text_response)
     print('🎵 Synthesized audio is sent to speaker.')
 
+def run_tts_stream(text_response: str):
+    print('🔊 Synthesizing text to PCM audio chunks...')
+    return stream_pcm16(text_response)
+
 def run_ocr(image_path: str):
     print(f'🖼️ Extracting text from image: {image_path}')
     extracted_text = extract_text_easyocr(image_path)
     print(f'📄 Extracted Text:\n{extracted_text}')
     return extracted_text
 
+def run_ocr_pages(image_paths):
+    print(f'🖼️ Extracting text from {len(image_paths)} page(s)...')
+    return extract_pages_easyocr(image_paths)
+
 def main():
     print('=== Starting Local Medical LLM Pipeline ===')
     input_audio_path = 'input_audio.wav'
@@ -3,7 +3,7 @@ import os
 import time
 import requests
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 from tqdm import tqdm
 
 def download_model(download_dir: str = "./models") -> str:
@@ -123,22 +123,19 @@ class BioGPTChat:
         
         if stream:
             print("Response: ", end="", flush=True)
-            response_text = ""
-            for output in self.llm(
-                formatted_prompt,
+            tokens = []
+            for token in self.stream_response(
+                prompt,
                 max_tokens=max_tokens,
                 temperature=temperature,
                 top_p=top_p,
                 top_k=top_k,
-                repeat_penalty=repeat_penalty,
-                stream=True,
-                stop=["Question:", "\n\n"]
+                repeat_penalty=repeat_penalty
             ):
-                token = output['choices'][0]['text']
                 print(token, end="", flush=True)
-                response_text += token
+                tokens.append(token)
             print()  # New line after streaming
-            return response_text.strip()
+            return "".join(tokens).strip()
         else:
             output = self.llm(
                 formatted_prompt,
@@ -158,6 +155,41 @@ class BioGPTChat:
             print(f"Generated {tokens_generated} tokens in {generation_time:.2f}s ({tokens_per_second:.1f} tokens/s)")
             return response
     
+    def stream_response(self,
+                        prompt: str,
+                        max_tokens: int = 1000,
+                        temperature: float = 0.7,
+                        top_p: float = 0.9,
+                        top_k: int = 40,
+                        repeat_penalty: float = 1.1) -> Iterator[str]:
+        """
+        Generate a response token by token
+        
+        Args:
+            prompt: Input text prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature (0.1-2.0)
+            top_p: Nucleus sampling parameter
+            top_k: Top-k sampling parameter
+            repeat_penalty: Penalty for repetition
+        
+        Yields:
+            Generated text pieces as soon as llama.cpp produces them
+        """
+        formatted_prompt = f"Question: {prompt}\nAnswer:"
+        
+        for output in self.llm(
+            formatted_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            top_k=top_k,
+            repeat_penalty=repeat_penalty,
+            stream=True,
+            stop=["Question:", "\n\n"]
+        ):
+            yield output['choices'][0]['text']
+    
     def chat_loop(self):
         """Interactive chat loop"""
         print("\n🧬 BioGPT Chat Interface")
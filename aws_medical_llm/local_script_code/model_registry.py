@@ -0,0 +1,216 @@
+import os
+import time
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from faster_whisper import WhisperModel
+from local_script_code.medical_advisor_agent import download_model, BioGPTChat
+from local_script_code.speech_to_text import download_model as download_whisper_model, transcribe_with_faster_whisper, transcribe_segments_with_faster_whisper
+
+BIOGPT_POOL_SIZE = int(os.getenv("BIOGPT_POOL_SIZE", "1"))
+BIOGPT_N_CTX = 2048
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))  # 0 lets CTranslate2 decide
+WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS", "1"))
+
+class BioGPTPool:
+    def __init__(self, size: int = BIOGPT_POOL_SIZE, n_ctx: int = BIOGPT_N_CTX, model_path: Optional[str] = None):
+        """
+        Process-wide pool of BioGPTChat instances
+
+        The GGUF model is loaded once (lazily on first use, or eagerly via load())
+        and each instance serves one request at a time, so `size` bounds both the
+        number of concurrent generations and the number of loaded copies.
+
+        Args:
+            size: Number of model instances / max concurrent generations
+            n_ctx: Context window size passed to BioGPTChat
+            model_path: Path to the GGUF file (downloaded if None)
+        """
+        self.size = max(1, size)
+        self.n_ctx = n_ctx
+        self.model_path = model_path
+        self._available = queue.Queue()
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._loaded = False
+        self._load_time = None
+        self._hits = 0
+        self._waiting = 0
+        self._in_use = 0
+
+    def load(self):
+        """Load all pool instances if they are not loaded yet"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            if self.model_path is None:
+                self.model_path = download_model()
+            start_time = time.time()
+            for i in range(self.size):
+                print(f'🧬 Initializing BioGPTChat instance {i + 1}/{self.size}...')
+                self._available.put(BioGPTChat(self.model_path, n_ctx=self.n_ctx))
+            self._load_time = time.time() - start_time
+            self._loaded = True
+            print(f'✅ BioGPT pool ready in {self._load_time:.2f}s')
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Borrow a model instance, blocking while all instances are busy
+
+        Raises:
+            TimeoutError: If no instance becomes free within `timeout` seconds
+        """
+        self.load()
+        with self._stats_lock:
+            self._waiting += 1
+        try:
+            bot = self._available.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No BioGPT instance available within {timeout}s")
+        finally:
+            with self._stats_lock:
+                self._waiting -= 1
+        with self._stats_lock:
+            self._hits += 1
+            self._in_use += 1
+        try:
+            yield bot
+        finally:
+            with self._stats_lock:
+                self._in_use -= 1
+            self._available.put(bot)
+
+    def generate(self, prompt: str, timeout: Optional[float] = None, **kwargs) -> str:
+        """Generate a response using a pooled instance"""
+        with self.acquire(timeout=timeout) as bot:
+            return bot.generate_response(prompt, **kwargs)
+
+    def generate_stream(self, prompt: str, timeout: Optional[float] = None, **kwargs) -> Iterator[str]:
+        """
+        Stream a response token by token using a pooled instance
+        
+        The instance stays checked out until the stream is exhausted or closed
+        (e.g. when an HTTP client disconnects), then returns to the pool.
+        """
+        with self.acquire(timeout=timeout) as bot:
+            yield from bot.stream_response(prompt, **kwargs)
+
+    def stats(self) -> dict:
+        """Return load time, hit count and queue depth for monitoring"""
+        with self._stats_lock:
+            return {
+                "loaded": self._loaded,
+                "pool_size": self.size,
+                "load_time_s": round(self._load_time, 3) if self._load_time is not None else None,
+                "hits": self._hits,
+                "in_use": self._in_use,
+                "queue_depth": self._waiting,
+            }
+
+_biogpt_pool = None
+_biogpt_pool_lock = threading.Lock()
+
+def get_biogpt_pool() -> BioGPTPool:
+    """Return the shared BioGPT pool, creating it on first call"""
+    global _biogpt_pool
+    if _biogpt_pool is None:
+        with _biogpt_pool_lock:
+            if _biogpt_pool is None:
+                _biogpt_pool = BioGPTPool()
+    return _biogpt_pool
+
+class WhisperEngine:
+    def __init__(self, repo_id: str, compute_type: str = "int8", cpu_threads: int = WHISPER_CPU_THREADS,
+                 num_workers: int = WHISPER_NUM_WORKERS, token: Optional[str] = None):
+        """
+        Resident faster-whisper model shared by all transcription requests
+
+        The Hub snapshot is resolved and the WhisperModel constructed once, on first
+        use. `num_workers` lets that many transcribe() calls decode in parallel.
+
+        Args:
+            repo_id: Hugging Face repo of the CTranslate2 whisper model
+            compute_type: CTranslate2 compute type (e.g. "int8", "float32")
+            cpu_threads: Threads per worker (0 = library default)
+            num_workers: Number of concurrent transcriptions the model accepts
+            token: Hugging Face token used for the one-time download
+        """
+        self.repo_id = repo_id
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.num_workers = max(1, num_workers)
+        self.token = token
+        self.model = None
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._load_time = None
+        self._hits = 0
+
+    def load(self):
+        """Download (if needed) and construct the WhisperModel once"""
+        if self.model is not None:
+            return
+        with self._load_lock:
+            if self.model is not None:
+                return
+            start_time = time.time()
+            model_path = download_whisper_model(self.repo_id, self.token)
+            self.model = WhisperModel(
+                model_path,
+                compute_type=self.compute_type,
+                cpu_threads=self.cpu_threads,
+                num_workers=self.num_workers,
+            )
+            self._load_time = time.time() - start_time
+            print(f'✅ Whisper engine {self.repo_id} ({self.compute_type}) ready in {self._load_time:.2f}s')
+
+    def transcribe(self, audio, **kwargs) -> str:
+        """Transcribe an audio path or 16 kHz float32 array with the resident model"""
+        self.load()
+        with self._stats_lock:
+            self._hits += 1
+        return transcribe_with_faster_whisper(audio, model=self.model, **kwargs)
+
+    def transcribe_segments(self, audio, **kwargs) -> list:
+        """Transcribe with the resident model, returning timestamped segments"""
+        self.load()
+        with self._stats_lock:
+            self._hits += 1
+        return transcribe_segments_with_faster_whisper(audio, model=self.model, **kwargs)
+
+    def stats(self) -> dict:
+        """Return load time and hit count for monitoring"""
+        with self._stats_lock:
+            return {
+                "repo_id": self.repo_id,
+                "compute_type": self.compute_type,
+                "loaded": self.model is not None,
+                "cpu_threads": self.cpu_threads,
+                "num_workers": self.num_workers,
+                "load_time_s": round(self._load_time, 3) if self._load_time is not None else None,
+                "hits": self._hits,
+            }
+
+_whisper_engines = {}
+_whisper_engines_lock = threading.Lock()
+
+def get_whisper_engine(repo_id: str, compute_type: str = "int8", cpu_threads: int = WHISPER_CPU_THREADS,
+                       num_workers: int = WHISPER_NUM_WORKERS, token: Optional[str] = None) -> WhisperEngine:
+    """Return the shared whisper engine for this model configuration, creating it on first call"""
+    key = (repo_id, compute_type, cpu_threads, num_workers)
+    with _whisper_engines_lock:
+        engine = _whisper_engines.get(key)
+        if engine is None:
+            engine = WhisperEngine(repo_id, compute_type, cpu_threads, num_workers, token)
+            _whisper_engines[key] = engine
+        return engine
+
+def whisper_stats() -> list:
+    """Return stats for every whisper engine created so far"""
+    with _whisper_engines_lock:
+        engines = list(_whisper_engines.values())
+    return [engine.stats() for engine in engines]
@@ -50,16 +50,19 @@ def record_until_enter(sample_rate=16000, channels=1):
     print("Recording stopped.")
     return np.concatenate(audio_frames, axis=0)
 
-def transcribe_with_faster_whisper(audio_path, model_path):
-    print(f"Loading faster-whisper model from local path: {model_path}")
-    model = WhisperModel(model_path, compute_type="int8")
-
-    print(f"Transcribing file: {audio_path}")
-    segments, info = model.transcribe(audio_path)
-
-    text = ""
-    for segment in segments:
-        text += segment.text
+def transcribe_segments_with_faster_whisper(audio_path, model_path=None, model=None, **kwargs):
+    """Return the transcript as a list of {"start", "end", "text"} dicts (times in seconds)"""
+    if model is None:
+        print(f"Loading faster-whisper model from local path: {model_path}")
+        model = WhisperModel(model_path, compute_type="int8")
+
+    print(f"Transcribing file: {audio_path if isinstance(audio_path, str) else 'in-memory audio'}")
+    segments, info = model.transcribe(audio_path, **kwargs)
+    return [{"start": segment.start, "end": segment.end, "text": segment.text} for segment in segments]
+
+def transcribe_with_faster_whisper(audio_path, model_path=None, model=None, **kwargs):
+    segments = transcribe_segments_with_faster_whisper(audio_path, model_path=model_path, model=model, **kwargs)
+    text = "".join(segment["text"] for segment in segments)
 
     print("Transcription:\n", text)
     return text
@@ -1,11 +1,31 @@
+import threading
 import numpy as np
 import sounddevice as sd
+from typing import Iterator
 from TTS.api import TTS
+from utils.tts_pipeline import split_sentences, ordered_pipeline
+from utils.tts_cache import cached_synthesis
 
 # ✅ Load once at start with GPU disabled for speed on CPU
 print("🔄 Loading Glow-TTS (CPU-only)...")
 tts = TTS("tts_models/en/ljspeech/glow-tts", gpu=False)
 sample_rate = tts.synthesizer.output_sample_rate
+# The model is shared by all requests and is not thread-safe
+_tts_lock = threading.Lock()
+
+def _synthesize_pcm16(text: str) -> bytes:
+    with _tts_lock:
+        audio = tts.tts(text)
+    audio_np = np.clip(np.asarray(audio, dtype=np.float32), -1.0, 1.0)
+    return (audio_np * 32767).astype(np.int16).tobytes()
+
+def synthesize_pcm16(text: str) -> bytes:
+    """Synthesize one chunk of text as mono 16-bit PCM at `sample_rate` (cached on disk)"""
+    return cached_synthesis(text, "ljspeech", "glow-tts", f"pcm16-{sample_rate}", _synthesize_pcm16)
+
+def stream_pcm16(text: str) -> Iterator[bytes]:
+    """Synthesize text sentence by sentence, yielding PCM chunks in order as they are ready"""
+    return ordered_pipeline(split_sentences(text), synthesize_pcm16, workers=1)
 
 def speak_text(text: str):
     if not text.strip():
@@ -13,14 +33,11 @@ def speak_text(text: str):
         return
 
     print("🧠 Synthesizing audio...")
-    audio = tts.tts(text)
-
-    # Ensure it's float32 between -1.0 and 1.0
-    audio_np = np.array(audio, dtype=np.float32)
-
     print(f"🔊 Playing audio at {sample_rate} Hz...")
-    sd.play(audio_np, samplerate=sample_rate)
-    sd.wait()
+    # The next sentence is synthesized while the current one plays
+    for pcm in stream_pcm16(text):
+        sd.play(np.frombuffer(pcm, dtype=np.int16), samplerate=sample_rate)
+        sd.wait()
     print("✅ Playback complete.")
 
 if __name__ == "__main__":
@@ -1,21 +1,30 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
-from medical_llm import medical_assistant
+from medical_llm import medical_assistant, rag_cache_stats
 from textract_ocr import extract_text_from_image
-from openai_whisper import transcribe_with_openai_whisper, detect_language
-from local_script_code.main_local import run_stt, run_tts, run_ocr
+from openai_whisper import transcribe_with_openai_whisper, transcribe_segments_with_openai_whisper
+from utils.langid import detect_language
+from utils.vad import speech_segments, trim_silence, vad_stats
+from utils.transcription import transcribe_chunked, PARALLEL_STT_MIN_S
+from utils.streaming_stt import STREAM_SAMPLE_RATE, open_stream, get_stream, close_stream
+from utils.audio_ingest import SAMPLE_RATE as AUDIO_SAMPLE_RATE, decode_audio, pcm16_to_float32, pcm16_to_wav_bytes
+from local_script_code.main_local import run_stt, run_stt_segments, run_tts, run_ocr, run_ocr_pages
+from local_script_code.local_ocr import get_ocr_engine
+from local_script_code.model_registry import get_biogpt_pool, whisper_stats
 #from utils.logger import setup_logging
 import logging
-from utils.connectivity import is_connected
-from utils.session import create_new_session, delete_session, get_all_sessions, save_user_input, get_user_inputs, get_user_inputs_formatted
-from utils.audio import synthesize_speech_base64
-from utils.LLM import get_answer, is_file_query
+from utils.connectivity import is_connected, get_connectivity_monitor
+from utils.session import create_new_session, delete_session, get_sessions_page, save_user_input, get_user_inputs, get_user_inputs_formatted, history_cache_stats
+from utils.tts_cache import tts_cache_stats
+from utils.audio import synthesize_speech_base64, synthesize_speech_stream, submit_speech, get_speech
+from utils.LLM import get_answer, get_answer_stream, is_file_query
 from threading import Thread
 from TTS_online import play_speech
 import subprocess
 import tempfile
 import os
-from utils.language import translate_text
+import json
+from utils.language import translate_text, translate_stream, translation_cache_stats
 from datetime import datetime
 
 app = Flask(__name__)
@@ -24,6 +33,26 @@ CORS(app)  # Enable CORS for all origins
 # Initialize logging
 logger = logging.getLogger('medical_app')#setup_logging()
 
+SESSIONS_PAGE_SIZE = 50
+SESSIONS_MAX_PAGE_SIZE = 500
+
+# Audio delivery modes: "async" (fetch from /audio/<id>), "inline" (base64 in the JSON body) or "none"
+AUDIO_MODES = ("async", "inline", "none")
+AUDIO_MAX_WAIT = 30
+
+def prepare_audio(text, voice, audio_mode):
+    """Return the audio fields of an answer response for the requested delivery mode"""
+    if audio_mode == "inline":
+        return {"audio_base64": synthesize_speech_base64(text, voice_id=voice)}
+    if audio_mode == "none":
+        return {"audio_base64": None}
+    try:
+        audio_id = submit_speech(text, voice_id=voice)
+    except RuntimeError as e:
+        logger.warning(f"Skipping answer audio: {e}")
+        return {"audio_base64": None}
+    return {"audio_base64": None, "audio_id": audio_id, "audio_url": f"/audio/{audio_id}"}
+
 # Chat history file-based storage
 # CHAT_HISTORY_DIR = Path("chat_history")
 # CHAT_HISTORY_DIR.mkdir(exist_ok=True)
@@ -37,12 +66,15 @@ def handle_question():
         use_rag = data.get("use_rag", False)
         voice = data.get("voice", "Joanna")
         session_id = data.get("session_id")
+        audio_mode = data.get("audio", "async")
 
         logger.info(f"Received question - Session: {session_id}, Use RAG: {use_rag}")
 
         if not question:
             logger.warning("Missing question in request")
             return jsonify({"error": "Missing 'question'"}), 400
+        if audio_mode not in AUDIO_MODES:
+            return jsonify({"error": f"'audio' must be one of {', '.join(AUDIO_MODES)}"}), 400
 
         # Create session if not provided
         if not session_id:
@@ -60,7 +92,7 @@ def handle_question():
         save_user_input(session_id, question, 'text', input_language=input_lang)
 
         # Handle translation if needed
-        connected = is_connected()
+        connected = is_connected("translate")
         if input_lang == "hi" and connected:
             translated_question = translate_text(question, "hi", "en")
             logger.info("Translated Hindi question to English")
@@ -77,8 +109,8 @@ def handle_question():
         else:
             final_answer = answer_en
 
-        # Generate audio
-        audio_base64 = synthesize_speech_base64(final_answer, voice_id=voice)
+        # Generate audio (in the background unless inline audio was requested)
+        audio_fields = prepare_audio(final_answer, voice, audio_mode)
      
         logger.info(f"Successfully processed question - Mode: {mode}")
         
@@ -87,7 +119,7 @@ def handle_question():
             "question": question,
             "translated_question": translated_question if (input_lang == "hi" and connected) else None,
             "answer": final_answer,
-            "audio_base64": audio_base64,
+            **audio_fields,
             "mode": mode,
             "context": context if context else None,
             "input_language": input_lang
@@ -97,6 +129,93 @@ def handle_question():
         logger.error(f"Error in handle_question: {e}")
         return jsonify({"error": str(e)}), 500
 
+def sse_event(event, data):
+    """Format one server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route("/ask_stream", methods=["POST"])
+def handle_question_stream():
+    """
+    Handle text-based questions, streaming the answer as server-sent events:
+    one "meta" event, "token" events as text arrives, then "done" (or "error").
+    """
+    try:
+        data = request.json
+        question = data.get("question")
+        use_rag = data.get("use_rag", False)
+        voice = data.get("voice", "Joanna")
+        session_id = data.get("session_id")
+        audio_mode = data.get("audio", "async")
+
+        logger.info(f"Received streaming question - Session: {session_id}, Use RAG: {use_rag}")
+
+        if not question:
+            logger.warning("Missing question in request")
+            return jsonify({"error": "Missing 'question'"}), 400
+        if audio_mode not in AUDIO_MODES:
+            return jsonify({"error": f"'audio' must be one of {', '.join(AUDIO_MODES)}"}), 400
+
+        # Create session if not provided
+        if not session_id:
+            session_id = create_new_session()
+
+        # Detect input language
+        input_lang = "en"
+        try:
+            input_lang = detect_language(question)
+            logger.info(f"Detected language: {input_lang}")
+        except Exception as e:
+            logger.warning(f"Language detection failed: {e}")
+
+        # Save user input
+        save_user_input(session_id, question, 'text', input_language=input_lang)
+
+        # Handle translation if needed
+        connected = is_connected("translate")
+        if input_lang == "hi" and connected:
+            translated_question = translate_text(question, "hi", "en")
+            logger.info("Translated Hindi question to English")
+        else:
+            translated_question = question
+
+        chunks, context, mode = get_answer_stream(translated_question, use_rag, session_id)
+
+        # Translate the answer back sentence by sentence as it streams
+        if input_lang == "hi" and connected:
+            chunks = translate_stream(chunks, "en", "hi")
+
+        def generate():
+            yield sse_event("meta", {
+                "session_id": session_id,
+                "question": question,
+                "translated_question": translated_question if (input_lang == "hi" and connected) else None,
+                "mode": mode,
+                "context": context if context else None,
+                "input_language": input_lang
+            })
+            answer_parts = []
+            try:
+                for chunk in chunks:
+                    answer_parts.append(chunk)
+                    yield sse_event("token", {"text": chunk})
+            except Exception as e:
+                logger.error(f"Error while streaming answer: {e}")
+                yield sse_event("error", {"error": str(e)})
+                return
+            answer = "".join(answer_parts).strip()
+            logger.info(f"Successfully streamed answer - Mode: {mode}")
+            yield sse_event("done", {"answer": answer, **prepare_audio(answer, voice, audio_mode)})
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    except Exception as e:
+        logger.error(f"Error in handle_question_stream: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/ask_with_file", methods=["POST"])
 def handle_question_with_file():
     """Handle questions with file uploads"""
@@ -105,35 +224,44 @@ def handle_question_with_file():
         use_rag = request.form.get("use_rag", "false").lower() == "true"
         voice = request.form.get("voice", "Joanna")
         session_id = request.form.get("session_id")
+        audio_mode = request.form.get("audio", "async")
         extracted_text = ""
         file_name = None
 
+        if audio_mode not in AUDIO_MODES:
+            return jsonify({"error": f"'audio' must be one of {', '.join(AUDIO_MODES)}"}), 400
+
         logger.info(f"Received file question - Session: {session_id}")
 
         # Create session if not provided
         if not session_id:
             session_id = create_new_session()
 
-        # Handle file upload
-        if 'file' in request.files:
-            file = request.files['file']
-            if file.filename:
-                file_name = file.filename
-                logger.info(f"Processing file: {file_name}")
-                temp_path = tempfile.mktemp(suffix=".png")
-                file.save(temp_path)
-                try:
-                    if is_connected():
-                        # Online OCR 
-                        extracted_text = extract_text_from_image(temp_path)
-                        logger.info(f"Extracted {len(extracted_text)} characters from image (online OCR)")
-                    else:
-                        # Offline OCR fallback
-                        extracted_text = run_ocr(temp_path)
-                        logger.info(f"Extracted {len(extracted_text)} characters from image (offline OCR)")
-                except Exception as e:
-                    logger.error(f"Error extracting text from image: {e}")
-                finally:
+        # Handle file upload (several "file" parts are treated as pages of one document)
+        files = [f for f in request.files.getlist('file') if f.filename]
+        if files:
+            file_name = ", ".join(f.filename for f in files)
+            logger.info(f"Processing file(s): {file_name}")
+            temp_paths = []
+            try:
+                for file in files:
+                    temp_path = tempfile.mktemp(suffix=".png")
+                    temp_paths.append(temp_path)
+                    file.save(temp_path)
+                if is_connected("textract"):
+                    # Online OCR 
+                    pages = [extract_text_from_image(temp_path) for temp_path in temp_paths]
+                    extracted_text = "\n\n".join(pages)
+                    logger.info(f"Extracted {len(extracted_text)} characters from {len(pages)} page(s) (online OCR)")
+                else:
+                    # Offline OCR fallback, batched across pages
+                    pages = run_ocr_pages(temp_paths) if len(temp_paths) > 1 else [run_ocr(temp_paths[0])]
+                    extracted_text = "\n\n".join(pages)
+                    logger.info(f"Extracted {len(extracted_text)} characters from {len(pages)} page(s) (offline OCR)")
+            except Exception as e:
+                logger.error(f"Error extracting text from image: {e}")
+            finally:
+                for temp_path in temp_paths:
                     if os.path.exists(temp_path):
                         os.remove(temp_path)
 
@@ -161,7 +289,7 @@ def handle_question_with_file():
                        file_name=file_name, extracted_text=extracted_text,
                        input_language=input_lang)
 
-        connected = is_connected()
+        connected = is_connected("translate")
 
         # Prepare full question with file content
         full_question = question
@@ -202,8 +330,8 @@ def handle_question_with_file():
         else:
             final_answer = answer_en
 
-        # Generate audio
-        audio_base64 = synthesize_speech_base64(final_answer, voice_id=voice)
+        # Generate audio (in the background unless inline audio was requested)
+        audio_fields = prepare_audio(final_answer, voice, audio_mode)
 
         logger.info(f"Successfully processed file question - Mode: {mode}")
 
@@ -213,7 +341,7 @@ def handle_question_with_file():
             "extracted_text": extracted_text if extracted_text else None,
             "translated_question": translated_question if (input_lang == "hi" and connected) else None,
             "answer": final_answer,
-            "audio_base64": audio_base64,
+            **audio_fields,
             "mode": mode,
             "context": context if context else None,
             "input_language": input_lang
@@ -242,39 +370,48 @@ def handle_transcription():
         else:
             logger.info(f"Using existing session ID: {session_id}")
 
-        logger.info("Saving uploaded audio file to temporary location")
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as temp_file:
-            temp_path = temp_file.name
-            audio_file.save(temp_path)
-            logger.info(f"Saved audio to: {temp_path}")
-
         try:
-            pcm_path = temp_path.replace(".webm", ".wav")
-            logger.info(f"Converting audio to WAV at: {pcm_path}")
-
-            # Convert audio format
-            subprocess.run([
-                "ffmpeg", "-y", "-i", temp_path,
-                "-vn",  # disable video
-                "-acodec", "pcm_s16le",
-                "-ar", "16000",
-                "-ac", "1",
-                pcm_path
-            ], check=True)
-            logger.info("Audio conversion completed successfully")
-
-            connected = is_connected()
-            logger.info(f"Internet connectivity status: {connected}")
-
-            # Transcribe audio
+            # Decode and resample in memory; no files are written unless ffmpeg needs a seekable input
+            logger.info("Decoding uploaded audio to 16 kHz mono PCM")
+            suffix = os.path.splitext(audio_file.filename or "")[1] or ".webm"
+            recording = decode_audio(audio_file.read(), suffix=suffix)
+            logger.info(f"Audio conversion completed successfully ({len(recording) / AUDIO_SAMPLE_RATE:.1f}s)")
+
+            # Drop leading/trailing silence and long pauses before paying for transcription;
+            # the detected speech is reused to split long recordings
+            speech = speech_segments(recording, AUDIO_SAMPLE_RATE)
+            samples, vad_info = trim_silence(recording, AUDIO_SAMPLE_RATE, segments=speech)
+            logger.info(f"VAD kept {vad_info['speech_s']}s of speech, trimmed {vad_info['trimmed_s']}s")
+            if not len(samples):
+                return jsonify({"error": "No speech detected in audio", "session_id": session_id}), 400
+
+            connected = is_connected("openai")
+            logger.info(f"OpenAI connectivity status: {connected}")
+
+            # Transcribe audio; long recordings are split at pauses and transcribed in parallel
+            long_recording = vad_info["speech_s"] >= PARALLEL_STT_MIN_S
+            segments = None
             if connected:
                 logger.info("Running online transcription (OpenAI Whisper)")
-                transcript = transcribe_with_openai_whisper(pcm_path)
+                if long_recording:
+                    result = transcribe_chunked(
+                        recording, lambda chunk: transcribe_segments_with_openai_whisper(pcm16_to_wav_bytes(chunk)),
+                        AUDIO_SAMPLE_RATE, segments=speech)
+                    transcript, segments = result["text"], result["segments"]
+                else:
+                    transcript = transcribe_with_openai_whisper(pcm16_to_wav_bytes(samples))
                 input_lang = detect_language(transcript)
                 logger.info(f"Detected input language: {input_lang}")
             else: 
                 logger.info("Running offline transcription (FasterWhisper/local)")
-                transcript = run_stt(pcm_path)
+                if long_recording:
+                    # The shared engine has at least PARALLEL_STT_WORKERS workers, so chunks decode concurrently
+                    result = transcribe_chunked(
+                        recording, lambda chunk: run_stt_segments(pcm16_to_float32(chunk)),
+                        AUDIO_SAMPLE_RATE, segments=speech)
+                    transcript, segments = result["text"], result["segments"]
+                else:
+                    transcript = run_stt(pcm16_to_float32(samples))
                 input_lang = 'en'
                 logger.info("Assumed English for offline mode")
 
@@ -285,7 +422,8 @@ def handle_transcription():
             logger.info(f"Saved voice input with message ID: {message_id}")
 
             # Handle translation if necessary
-            if input_lang == "hi" and connected:
+            translate_connected = is_connected("translate")
+            if input_lang == "hi" and translate_connected:
                 logger.info("Translating transcript from Hindi to English")
                 translated_transcript = translate_text(transcript, "hi", "en")
                 logger.info(f"Translated transcript: {translated_transcript[:100]}")
@@ -297,7 +435,7 @@ def handle_transcription():
             answer_en, context, mode = get_answer(translated_transcript, True, session_id)
             logger.info(f"LLM mode used: {mode}")
 
-            if input_lang == "hi" and connected:
+            if input_lang == "hi" and translate_connected:
                 logger.info("Translating answer from English back to Hindi")
                 final_answer = translate_text(answer_en, "en", "hi")
                 logger.info(f"Final translated answer: {final_answer[:100]}")
@@ -306,7 +444,7 @@ def handle_transcription():
 
             # Play audio response
             logger.info("Starting TTS response playback")
-            if connected: 
+            if is_connected("polly"):
                 detected_output_lang = detect_language(final_answer)
                 voice = "Aditi" if detected_output_lang == "hi" else "Joanna"
                 logger.info(f"Using voice: {voice}")
@@ -319,30 +457,124 @@ def handle_transcription():
             return jsonify({
                 "session_id": session_id,
                 "transcript": transcript,
-                "translated_transcript": translated_transcript if (input_lang == "hi" and connected) else None,
+                "translated_transcript": translated_transcript if (input_lang == "hi" and translate_connected) else None,
                 "answer": final_answer,
                 "context": context if context else None,
                 "mode": mode,
-                "input_language": input_lang
+                "input_language": input_lang,
+                "segments": segments,
+                "vad": vad_info
             })
 
         except subprocess.CalledProcessError as e:
             logger.error(f"Audio conversion failed with ffmpeg: {e}")
             return jsonify({"error": "Audio conversion failed"}), 500
 
-        finally:
-            logger.info("Skipping temp file deletion for debugging purposes")
-            logger.info(f"Temp file paths:\n - {temp_path}\n - {pcm_path}")
-            # Comment these lines out for now:
-            # for path in [temp_path, pcm_path]:
-            #     if os.path.exists(path):
-            #         os.remove(path)
-            #         logger.info(f"Deleted temp file: {path}")
-
     except Exception as e:
         logger.error(f"Error in handle_transcription: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
+def _stream_transcribe_segments(audio, initial_prompt):
+    return run_stt_segments(audio, initial_prompt=initial_prompt)
+
+@app.route("/transcribe_stream", methods=["POST"])
+def start_transcription_stream():
+    """
+    Open a streaming transcription session. The client then POSTs raw 16 kHz mono
+    PCM16 (little-endian) frames to /transcribe_stream/<id> as they are recorded and
+    gets partial transcripts back, and POSTs to /transcribe_stream/<id>/end to finish.
+    """
+    try:
+        stream_id = open_stream(_stream_transcribe_segments)
+        logger.info(f"Opened transcription stream {stream_id}")
+        return jsonify({"stream_id": stream_id, "sample_rate": STREAM_SAMPLE_RATE, "format": "pcm_s16le"})
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        logger.error(f"Error opening transcription stream: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/transcribe_stream/<stream_id>", methods=["POST"])
+def push_transcription_stream(stream_id):
+    """Append audio frames; returns committed and partial transcript and whether the speaker stopped"""
+    try:
+        stream = get_stream(stream_id)
+        if stream is None:
+            return jsonify({"error": "Stream not found"}), 404
+        return jsonify(stream.add(request.get_data()))
+    except Exception as e:
+        logger.error(f"Error in transcription stream {stream_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/transcribe_stream/<stream_id>/end", methods=["POST"])
+def end_transcription_stream(stream_id):
+    """Transcribe any remaining audio (frames may be sent in this request too) and close the stream"""
+    try:
+        stream = close_stream(stream_id)
+        if stream is None:
+            return jsonify({"error": "Stream not found"}), 404
+        data = request.get_data()
+        if data:
+            stream.add(data)
+        state = stream.finish()
+        logger.info(f"Closed transcription stream {stream_id}: {state['transcript'][:100]}")
+        return jsonify(state)
+    except Exception as e:
+        logger.error(f"Error ending transcription stream {stream_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/audio/<audio_id>", methods=["GET"])
+def get_audio(audio_id):
+    """
+    Return synthesized answer audio as raw bytes (supports Range requests).
+    Waits up to ?wait= seconds (default 10) for synthesis that is still running.
+    """
+    try:
+        wait = max(0.0, min(request.args.get('wait', 10, type=float), AUDIO_MAX_WAIT))
+        job = get_speech(audio_id, timeout=wait)
+        if job is None:
+            return jsonify({"error": "Audio not found"}), 404
+        if job["status"] == "pending":
+            return jsonify({"status": "pending"}), 202
+        if job["status"] == "error":
+            return jsonify({"error": job["error"]}), 500
+
+        audio = job["audio"]
+        if request.range is None:
+            response = Response(audio, mimetype=job["mimetype"])
+        else:
+            byte_range = request.range.range_for_length(len(audio))
+            if byte_range is None:
+                return Response(status=416, headers={"Content-Range": f"bytes */{len(audio)}"})
+            start, stop = byte_range
+            response = Response(audio[start:stop], status=206, mimetype=job["mimetype"])
+            response.headers["Content-Range"] = request.range.to_content_range_header(len(audio))
+        response.headers["Accept-Ranges"] = "bytes"
+        response.headers["Cache-Control"] = "private, max-age=600"
+        return response
+    except Exception as e:
+        logger.error(f"Error getting audio {audio_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/speak", methods=["POST"])
+def speak():
+    """
+    Stream synthesized speech for arbitrary text. Audio is sent sentence by sentence
+    as it is synthesized, so playback can start before the whole text is done.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        text = data.get("text", "")
+        voice = data.get("voice", "Joanna")
+        if not text.strip():
+            return jsonify({"error": "No text provided"}), 400
+
+        mimetype, chunks = synthesize_speech_stream(text, voice_id=voice)
+        return Response(stream_with_context(chunks), mimetype=mimetype)
+    except Exception as e:
+        logger.error(f"Error in speak: {e}")
+        return jsonify({"error": str(e)}), 500
+
 # Chat history management endpoints
 
 @app.route("/history/<session_id>", methods=["GET"])
@@ -362,11 +594,16 @@ def get_session_history(session_id):
 
 @app.route("/sessions", methods=["GET"])
 def get_sessions():
-    """Get all chat sessions"""
+    """Get a page of chat sessions (use next_cursor to fetch the following page)"""
     try:
-        sessions = get_all_sessions()
+        limit = max(1, min(request.args.get('limit', SESSIONS_PAGE_SIZE, type=int), SESSIONS_MAX_PAGE_SIZE))
+        cursor = request.args.get('cursor')
+        try:
+            sessions, next_cursor = get_sessions_page(limit=limit, cursor=cursor)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         logger.info(f"Retrieved {len(sessions)} sessions")
-        return jsonify({"sessions": sessions})
+        return jsonify({"sessions": sessions, "next_cursor": next_cursor})
     except Exception as e:
         logger.error(f"Error getting sessions: {e}")
         return jsonify({"error": str(e)}), 500
@@ -409,6 +646,31 @@ def export_session_history(session_id):
         logger.error(f"Error exporting session history: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route("/stats", methods=["GET"])
+def get_stats():
+    """Report resident model and cache statistics"""
+    try:
+        return jsonify({
+            "models": {
+                "biogpt": get_biogpt_pool().stats(),
+                "whisper": whisper_stats(),
+                "ocr": get_ocr_engine().stats()
+            },
+            "caches": {
+                "history": history_cache_stats(),
+                "rag": rag_cache_stats(),
+                "tts": tts_cache_stats(),
+                "translation": translation_cache_stats()
+            },
+            "audio": {
+                "vad": vad_stats()
+            },
+            "connectivity": get_connectivity_monitor().status()
+        })
+    except Exception as e:
+        logger.error(f"Error getting stats: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/")
 def index():
     """Health check endpoint"""
@@ -420,4 +682,10 @@ def index():
 
 if __name__ == "__main__":
     logger.info("Starting Medical LLM backend server with improved context handling")
+    get_connectivity_monitor()
+    if os.getenv("PRELOAD_OFFLINE_MODELS", "false").lower() == "true":
+        logger.info("Preloading offline BioGPT model")
+        get_biogpt_pool().load()
+        logger.info("Preloading offline OCR reader")
+        get_ocr_engine().load()
     app.run(host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,13 +1,16 @@
 import os
 import json
 import logging
-import boto3
 import time
 import sys
 from botocore.exceptions import ClientError
 from pinecone import Pinecone
 from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
+from utils.cache import LRUCache
+from utils.aws import get_client
+from utils.retriever import PineconeRetriever, LocalRetriever
+from utils.script import is_script
 
 # === CONFIGURATION ===
 load_dotenv()
@@ -17,6 +20,12 @@ PINECONE_REGION = "us-east-1"
 INDEX_NAME = "medical-demo"
 BEDROCK_REGION = "us-east-1"
 MODEL_ID = "anthropic.claude-3-5-sonnet-20240620-v1:0"  
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "4096"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "3600"))  # seconds before cached matches are re-queried
+QUERY_CACHE_PATH = os.getenv("QUERY_CACHE_PATH")  # optional SQLite file to persist embeddings
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "pinecone")  # "pinecone" or "local"
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "vector_index")
+HINDI_CONTEXT_THRESHOLD = 0.2  # share of Devanagari letters above which retrieved context counts as Hindi
 
 # === SETUP LOGGING ===
 logger = logging.getLogger(__name__)
@@ -31,8 +40,17 @@ print("Connecting to Pinecone...")
 pc = Pinecone(api_key=PINECONE_API_KEY)
 index = pc.Index(INDEX_NAME)
 
+# === Retrievers ===
+pinecone_retriever = PineconeRetriever(index)
+local_retriever = LocalRetriever(LOCAL_INDEX_DIR)
+
+# === Query Caches ===
+# Embeddings are deterministic so they never expire; matches expire as the index changes
+embedding_cache = LRUCache(max_entries=QUERY_CACHE_SIZE, disk_path=QUERY_CACHE_PATH)
+match_cache = LRUCache(max_entries=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+
 # === Bedrock Setup ===
-bedrock = boto3.client(service_name='bedrock-runtime', region_name=BEDROCK_REGION)
+bedrock = get_client('bedrock-runtime', region_name=BEDROCK_REGION)
 
 # === Custom Exception ===
 class ModelError(Exception):
@@ -78,9 +96,9 @@ def smooth_print_sentences(text, delay=0.3):
     print()  # New line at the end
 
 # === Text Generation with Claude ===
-def generate_text(prompt, temperature=0.3):
+def _request_body(prompt, temperature):
     # Updated payload structure for Claude via Bedrock
-    body = json.dumps({
+    return json.dumps({
         "anthropic_version": "bedrock-2023-05-31",
         "max_tokens": 1024,
         "temperature": temperature,
@@ -90,6 +108,9 @@ def generate_text(prompt, temperature=0.3):
         ]
     })
 
+def generate_text(prompt, temperature=0.3):
+    body = _request_body(prompt, temperature)
+
     try:
         response = bedrock.invoke_model(
             body=body,
@@ -115,37 +136,105 @@ def generate_text(prompt, temperature=0.3):
         logger.error(f"AWS Client Error: {message}")
         raise
 
+def generate_text_stream(prompt, temperature=0.3):
+    """Yield text deltas from Claude as they are generated"""
+    body = _request_body(prompt, temperature)
+
+    try:
+        response = bedrock.invoke_model_with_response_stream(
+            body=body,
+            modelId=MODEL_ID,
+            accept="application/json",
+            contentType="application/json"
+        )
+
+        for event in response.get("body"):
+            chunk = event.get("chunk")
+            if not chunk:
+                continue
+            payload = json.loads(chunk["bytes"])
+            if payload.get("type") == "content_block_delta":
+                text = payload.get("delta", {}).get("text")
+                if text:
+                    yield text
+            elif payload.get("type") == "error":
+                raise ModelError(f"Text generation error: {payload.get('error')}")
+
+    except ClientError as err:
+        message = err.response["Error"]["Message"]
+        logger.error(f"AWS Client Error: {message}")
+        raise
+
 # === Pinecone Query ===
-def get_context_from_pinecone(query_text, top_k=5, namespace=None):
-    print(f"\nRetrieving context from Pinecone for: \"{query_text}\"")
-    query_vector = model.encode(query_text).tolist()
+def normalize_query(query_text):
+    """Normalize a query so trivially different phrasings share cache entries"""
+    return " ".join(query_text.lower().split()).rstrip("?!. ")
 
-    results = index.query(
-        vector=query_vector,
-        top_k=top_k,
-        include_metadata=True,
-        namespace=namespace
-    )
+def embed_query(query_text):
+    """Return the (cached) embedding of a query as a list of floats"""
+    # Embed exactly the string used as the key, so every query sharing an entry gets the same vector
+    normalized = normalize_query(query_text)
+    key = f"normalized:{normalized}"  # prefix keeps persisted entries embedded from raw text out of use
+    query_vector = embedding_cache.get(key)
+    if query_vector is None:
+        query_vector = model.encode(normalized).tolist()
+        embedding_cache.set(key, query_vector)
+    return query_vector
+
+def get_retriever(online=True):
+    """
+    Return the retriever to use, or None if no backend is usable.
+    The local index serves all queries when RETRIEVER_BACKEND=local and is the
+    fallback when Pinecone is unreachable.
+    """
+    if RETRIEVER_BACKEND == "local" or not online:
+        return local_retriever if local_retriever.available() else None
+    return pinecone_retriever
+
+def get_context(query_text, top_k=5, namespace=None, retriever=None):
+    retriever = retriever or get_retriever()
+    if retriever is None:
+        return ""
+    print(f"\nRetrieving context from {retriever.name} for: \"{query_text}\"")
+    match_key = f"{retriever.name}|{namespace or ''}|{top_k}|{normalize_query(query_text)}"
+    context_texts = match_cache.get(match_key)
+    if context_texts is not None:
+        return "\n".join(context_texts)
+
+    query_vector = embed_query(query_text)
+    matches = retriever.query(query_vector, top_k=top_k, namespace=namespace)
 
     context_texts = []
-    for i, match in enumerate(results['matches']):
-        metadata = match.get("metadata", {})
-        text = metadata.get("text", "")
+    for match in matches:
+        text = match["metadata"].get("text", "")
         if text:
             context_texts.append(text)
 
+    match_cache.set(match_key, context_texts)
     return "\n".join(context_texts)
 
+def get_context_from_pinecone(query_text, top_k=5, namespace=None):
+    return get_context(query_text, top_k, namespace, retriever=pinecone_retriever)
+
+def rag_cache_stats():
+    """Return hit/miss counters of the query embedding and match caches"""
+    return {"embeddings": embedding_cache.stats(), "matches": match_cache.stats()}
+
 # === Claude-based Assistant ===
+def assistant_prompt(user_input):
+    return f"You are a kind, empathetic medical assistant. Respond calmly and clearly.\nQuestion: {user_input}"
+
 def medical_assistant(user_input):
-    prompt = f"You are a kind, empathetic medical assistant. Respond calmly and clearly.\nQuestion: {user_input}"
-    return generate_text(prompt, temperature=0.6)
+    return generate_text(assistant_prompt(user_input), temperature=0.6)
+
+def medical_assistant_stream(user_input):
+    return generate_text_stream(assistant_prompt(user_input), temperature=0.6)
 
 # === RAG Assistant with Claude ===
-def contains_hindi(text):
-    return any('\u0900' <= c <= '\u097F' for c in text)
+def contains_hindi(text, threshold=HINDI_CONTEXT_THRESHOLD):
+    return is_script(text, "devanagari", threshold)
 
-def medical_rag_assistant(user_input, context):
+def rag_prompt(user_input, context):
     if contains_hindi(context):
         # Ignore context if it is in Hindi
         prompt = (
@@ -159,7 +248,13 @@ def medical_rag_assistant(user_input, context):
         f"Context:\n{context if context.strip() else '[No relevant context]'}\n\n"
         f"Question: {user_input}"
         )
-    return generate_text(prompt, temperature=0.3)
+    return prompt
+
+def medical_rag_assistant(user_input, context):
+    return generate_text(rag_prompt(user_input, context), temperature=0.3)
+
+def medical_rag_assistant_stream(user_input, context):
+    return generate_text_stream(rag_prompt(user_input, context), temperature=0.3)
 
 # === CLI ===
 if __name__ == "__main__":
@@ -175,7 +270,7 @@ if __name__ == "__main__":
             if mode == "1":
                 response = medical_assistant(user_input)
             else:
-                context = get_context_from_pinecone(user_input, top_k=5)
+                context = get_context(user_input, top_k=5)
                 response = medical_rag_assistant(user_input, context)
 
             print(f"\n🩺 Response:")
@@ -3,11 +3,12 @@ import numpy as np
 import sounddevice as sd
 from scipy.io.wavfile import write
 import soundfile as sf
+import soxr
 import librosa
 import openai
 import os
 from dotenv import load_dotenv
-from langdetect import detect
+from utils.langid import detect_language
 
 # === CONFIGURATION ===
 load_dotenv()
@@ -26,36 +27,125 @@ def record_audio(duration=5, fs=SAMPLE_RATE):
     return temp_file.name
 
 # === CONVERT TO PCM FORMAT ===
-def convert_to_pcm(input_path, output_path, target_samplerate=SAMPLE_RATE):
+# soxr quality presets, fastest first; "soxr_hq" matches librosa's default resampler
+RESAMPLERS = {"soxr_qq": "QQ", "soxr_lq": "LQ", "soxr_mq": "MQ", "soxr_hq": "HQ", "soxr_vhq": "VHQ"}
+PCM_RESAMPLER = os.getenv("PCM_RESAMPLER", "soxr_mq")
+PCM_BLOCK_FRAMES = 1 << 18  # ~6 s at 44.1 kHz per chunk
+
+def _read_resampled(input_path, target_samplerate, resampler):
+    """
+    Decode and resample in fixed-size blocks into one preallocated float32 buffer.
+    Returns (samples, original samplerate).
+    """
+    info = sf.info(input_path)
+    samplerate = info.samplerate
+    capacity = int(np.ceil(info.frames * target_samplerate / samplerate)) + PCM_BLOCK_FRAMES
+    out = np.empty(capacity, dtype=np.float32)
+    stream = None
+    if samplerate != target_samplerate:
+        stream = soxr.ResampleStream(samplerate, target_samplerate, 1, dtype="float32",
+                                     quality=RESAMPLERS[resampler])
+    filled = 0
+    blocks = sf.blocks(input_path, blocksize=PCM_BLOCK_FRAMES, dtype="float32", always_2d=True)
+    for block in blocks:
+        mono = block[:, 0] if block.shape[1] == 1 else block.mean(axis=1, dtype=np.float32)
+        if stream is not None:
+            mono = stream.resample_chunk(mono)
+        out[filled:filled + len(mono)] = mono
+        filled += len(mono)
+    if stream is not None:
+        tail = stream.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+        out[filled:filled + len(tail)] = tail
+        filled += len(tail)
+    return out[:filled], samplerate
+
+def to_int16_normalized(data):
+    """
+    Peak-normalize float samples to int16, scaling `data` in place.
+    Silent input yields zeros instead of dividing by zero.
+    """
+    peak = max(float(data.max(initial=0.0)), -float(data.min(initial=0.0)))
+    if peak == 0.0:
+        return np.zeros(len(data), dtype=np.int16)
+    data *= 32767 / peak
+    np.clip(data, -32767, 32767, out=data)
+    return data.astype(np.int16)
+
+def convert_to_pcm(input_path, output_path, target_samplerate=SAMPLE_RATE, resampler=PCM_RESAMPLER):
+    """
+    Convert an audio file to peak-normalized mono 16-bit PCM WAV at `target_samplerate`.
+
+    Files libsndfile can read are decoded and resampled in blocks with soxr at the
+    selected quality ("soxr_qq" fastest ... "soxr_vhq" best); other formats fall
+    back to librosa.
+    """
+    if resampler not in RESAMPLERS:
+        raise ValueError(f"resampler must be one of {', '.join(RESAMPLERS)}")
     print(f"Reading input WAV: {input_path}")
-    data, samplerate = librosa.load(input_path, sr=None, mono=True)  # Always returns float32 mono
-    print(f"Original samplerate: {samplerate}, shape: {data.shape}")
+    try:
+        data, samplerate = _read_resampled(input_path, target_samplerate, resampler)
+    except RuntimeError:  # libsndfile cannot read this format (e.g. webm)
+        data, samplerate = librosa.load(input_path, sr=target_samplerate, mono=True, res_type=resampler)
+    print(f"Original samplerate: {samplerate}, resampled shape: {data.shape}")
+
+    write(output_path, target_samplerate, to_int16_normalized(data))
+    print(f"Saved converted PCM WAV to: {output_path}")
 
+def _convert_to_pcm_librosa(input_path, output_path, target_samplerate=SAMPLE_RATE):
+    """The original whole-file librosa conversion, kept as the benchmark baseline"""
+    data, samplerate = librosa.load(input_path, sr=None, mono=True)
     if samplerate != target_samplerate:
         data = librosa.resample(data, orig_sr=samplerate, target_sr=target_samplerate)
-        print(f"Resampled shape: {data.shape}")
-
-    # Normalize and convert to int16
     data_int16 = np.int16(data / np.max(np.abs(data)) * 32767)
     write(output_path, target_samplerate, data_int16)
-    print(f"Saved converted PCM WAV to: {output_path}")
+
+def benchmark_convert_to_pcm(minutes=(1, 10, 60), source_samplerate=44100, resampler=PCM_RESAMPLER):
+    """Time convert_to_pcm against the librosa baseline on synthetic stereo recordings"""
+    import time
+    rng = np.random.default_rng(0)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for length in minutes:
+            input_path = os.path.join(directory, f"input_{length}min.wav")
+            with sf.SoundFile(input_path, "w", source_samplerate, 2, subtype="PCM_16") as f:
+                for _ in range(length * 60):
+                    f.write((rng.standard_normal((source_samplerate, 2)) * 0.1).astype(np.float32))
+            timings = {"minutes": length}
+            for name, convert in (("librosa", _convert_to_pcm_librosa),
+                                  ("chunked", lambda i, o: convert_to_pcm(i, o, resampler=resampler))):
+                start = time.perf_counter()
+                convert(input_path, os.path.join(directory, f"{name}.wav"))
+                timings[f"{name}_s"] = round(time.perf_counter() - start, 3)
+            results.append(timings)
+            print(timings)
+    return results
 
 # === TRANSCRIBE AUDIO ===
-def transcribe_with_openai_whisper(audio_file_path):
+def transcribe_with_openai_whisper(audio):
+    """Transcribe a WAV file path, or in-memory WAV bytes"""
     print("Transcribing with OpenAI Whisper...")
-    with open(audio_file_path, "rb") as audio_file:
+    if isinstance(audio, bytes):
+        transcript = openai.audio.transcriptions.create(
+            file=("audio.wav", audio),
+            model="whisper-1"
+        )
+        return transcript.text
+    with open(audio, "rb") as audio_file:
         transcript = openai.audio.transcriptions.create(
             file=audio_file,
             model="whisper-1"
         )
     return transcript.text
 
-# === DETECT LANGUAGE ===
-def detect_language(text):
-    try:
-        return detect(text)
-    except:
-        return "unknown"
+def transcribe_segments_with_openai_whisper(audio):
+    """Transcribe WAV bytes into timestamped {"start", "end", "text"} segments"""
+    transcript = openai.audio.transcriptions.create(
+        file=("audio.wav", audio),
+        model="whisper-1",
+        response_format="verbose_json"
+    )
+    return [{"start": segment.start, "end": segment.end, "text": segment.text}
+            for segment in (transcript.segments or [])]
 
 # === OPTIONAL: TRANSLATE IF NOT ENGLISH ===
 def translate_to_english_if_needed(text, detected_language):
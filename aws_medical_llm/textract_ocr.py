@@ -1,9 +1,9 @@
 # doctors_handwritten_text
-import boto3
+from utils.aws import get_client
 
 def extract_text_from_image(image_path, region="us-east-1"):
     # Initialize Textract client
-    textract = boto3.client('textract', region_name=region)
+    textract = get_client('textract', region_name=region)
     
     # Read the image bytes
     with open(image_path, 'rb') as document:
@@ -1,8 +1,80 @@
 import logging 
 from utils.connectivity import is_connected
 from utils.session import get_user_inputs_formatted
-from local_script_code.main_local import run_llm
-from medical_llm import medical_rag_assistant, get_context_from_pinecone
+from local_script_code.main_local import run_llm, run_llm_stream
+from medical_llm import medical_rag_assistant, medical_rag_assistant_stream, get_context, get_retriever
+
+# Offline BioGPT has a 2048-token window, so retrieved context is kept short
+OFFLINE_RAG_TOP_K = 2
+OFFLINE_RAG_MAX_CHARS = 1500
+
+ERROR_ANSWER = "I apologize, but I encountered an error processing your question."
+
+def _retrieve(question, retriever, logger, **kwargs):
+    """Return RAG context for the question, or None if the retriever's index files are missing"""
+    try:
+        return get_context(question, retriever=retriever, **kwargs)
+    except FileNotFoundError as e:
+        logger.warning(f"{retriever.name} index unavailable, answering without RAG: {e}")
+        return None
+
+def _plan_answer(question, use_rag, session_id, logger):
+    """
+    Decide how a question is answered.
+    Returns (prompt_input, full_context, mode): for "online_with_rag" the prompt
+    input is the question (answered by Claude with full_context), otherwise it is
+    the full question passed to run_llm.
+    """
+    connected = is_connected("bedrock")
+    # Offline answers only use the local index, so the mode label matches where context came from
+    retriever = get_retriever(online=connected and is_connected("pinecone")) if use_rag else None
+    use_rag = retriever is not None
+    logger.info(f"Getting answer - Connected: {connected}, Use RAG: {use_rag}")
+    
+    # Get formatted chat history
+    chat_history = get_user_inputs_formatted(session_id, limit=8) if session_id else ""
+    
+    rag_context = _retrieve(question, retriever, logger) if use_rag and connected else None
+    if rag_context is not None:
+        # Always combine contexts intelligently
+        if chat_history and rag_context:
+            full_context = f"{chat_history}Relevant medical information:\n{rag_context}"
+            logger.info("Using combined chat history and RAG context")
+        elif chat_history:
+            full_context = chat_history
+            logger.info("Using only chat history context (RAG context empty)")
+        elif rag_context:
+            full_context = f"Relevant medical information:\n{rag_context}"
+            logger.info("Using only RAG context (no chat history)")
+        else:
+            full_context = ""
+            logger.info("No context available (neither RAG nor chat history)")
+        
+        return question, full_context, "online_with_rag"
+        
+    # Offline or non-RAG mode
+    full_context = chat_history
+    if connected:
+        # Optional: add chat history for online mode
+        if chat_history:
+            full_question = f"{chat_history}Current question: {question}"
+            logger.info("Using chat history for online model")
+        else:
+            full_question = question
+        return full_question, full_context, "online_no_rag"
+
+    # Offline mode (BioGPT) — no history
+    full_question = question.strip()
+    logger.info("Running offline mode with no chat history")
+    if use_rag:
+        # Local vector index keeps RAG available without a network
+        rag_context = (_retrieve(question, retriever, logger, top_k=OFFLINE_RAG_TOP_K) or "")[:OFFLINE_RAG_MAX_CHARS]
+        if rag_context:
+            full_question = f"Relevant medical information:\n{rag_context}\n\n{full_question}"
+            logger.info("Using local RAG context for offline model")
+            return full_question, rag_context, "offline_with_rag"
+    return full_question, full_context, "offline"
+
 def get_answer(question, use_rag, session_id=None):
     """
     Returns answer and context depending on connection and use_rag flag.
@@ -11,57 +83,51 @@ def get_answer(question, use_rag, session_id=None):
     logger = logging.getLogger('medical_app')
 
     try:
-        connected = is_connected()
-        logger.info(f"Getting answer - Connected: {connected}, Use RAG: {use_rag}")
-        
-        # Get formatted chat history
-        chat_history = get_user_inputs_formatted(session_id, limit=8) if session_id else ""
-        
-        if use_rag and connected:
-            # Get RAG context
-            rag_context = get_context_from_pinecone(question)
-            
-            # Always combine contexts intelligently
-            if chat_history and rag_context:
-                full_context = f"{chat_history}Relevant medical information:\n{rag_context}"
-                logger.info("Using combined chat history and RAG context")
-            elif chat_history:
-                full_context = chat_history
-                logger.info("Using only chat history context (RAG context empty)")
-            elif rag_context:
-                full_context = f"Relevant medical information:\n{rag_context}"
-                logger.info("Using only RAG context (no chat history)")
-            else:
-                full_context = ""
-                logger.info("No context available (neither RAG nor chat history)")
-            
-            answer = medical_rag_assistant(question, full_context)
-            mode = "online_with_rag"
-            
-        else: 
-            # Offline or non-RAG mode
-            full_context = chat_history
-            if connected:
-    # Optional: add chat history for online mode
-                if chat_history:
-                    full_question = f"{chat_history}Current question: {question}"
-                    logger.info("Using chat history for online model")
-                else:
-                    full_question = question
-            else:
-                # Offline mode (BioGPT) — no history
-                full_question = question.strip()
-                logger.info("Running offline mode with no chat history")
-                    
-            answer = run_llm(full_question)
-            mode = "offline" if not connected else "online_no_rag"
+        prompt_input, full_context, mode = _plan_answer(question, use_rag, session_id, logger)
+        if mode == "online_with_rag":
+            answer = medical_rag_assistant(prompt_input, full_context)
+        else:
+            answer = run_llm(prompt_input)
 
         logger.info(f"Used {mode} mode with context length: {len(full_context)}")
         return answer, full_context, mode
         
     except Exception as e:
         logger.error(f"Error getting answer: {e}")
-        return "I apologize, but I encountered an error processing your question.", "", "error"
+        return ERROR_ANSWER, "", "error"
+
+def _lstrip_stream(chunks):
+    """Drop leading whitespace from a chunk stream, as generate_response strips its answer"""
+    chunks = iter(chunks)
+    for chunk in chunks:
+        chunk = chunk.lstrip()
+        if chunk:
+            yield chunk
+            break
+    yield from chunks
+
+def get_answer_stream(question, use_rag, session_id=None):
+    """
+    Streaming variant of get_answer.
+    Returns (chunks, context, mode) where chunks is an iterator of answer text
+    pieces; online answers stream from Bedrock and offline answers from BioGPT
+    as they are generated.
+    """
+    logger = logging.getLogger('medical_app')
+
+    try:
+        prompt_input, full_context, mode = _plan_answer(question, use_rag, session_id, logger)
+        if mode == "online_with_rag":
+            chunks = medical_rag_assistant_stream(prompt_input, full_context)
+        else:
+            chunks = run_llm_stream(prompt_input)
+
+        logger.info(f"Streaming {mode} mode with context length: {len(full_context)}")
+        return _lstrip_stream(chunks), full_context, mode
+
+    except Exception as e:
+        logger.error(f"Error getting answer: {e}")
+        return iter([ERROR_ANSWER]), "", "error"
 
 def is_file_query(question, extracted_text):
     """Check if the query is related to file content"""
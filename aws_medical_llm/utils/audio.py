@@ -1,30 +1,170 @@
-import logging 
-import boto3 
+import time
+import uuid
+import struct
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from utils.connectivity import is_connected
-from local_script_code.main_local  import run_tts
+from utils.tts_pipeline import split_sentences, ordered_pipeline
+from utils.tts_cache import cached_synthesis
+from utils.aws import get_client
+from local_script_code.main_local import run_tts_stream
+from local_script_code.text_to_speech import sample_rate as OFFLINE_SAMPLE_RATE
 import base64
 
-def synthesize_speech_base64(text, voice_id="Joanna", region="us-east-1"):
-    """Synthesize speech and return base64 encoded audio"""
+# Background synthesis: worker count, how long finished audio is kept and how many jobs are kept
+AUDIO_WORKERS = 4
+AUDIO_TTL = 600
+AUDIO_MAX_JOBS = 256
+# Jobs waiting or running at once; further submissions are rejected
+AUDIO_MAX_PENDING = 64
+# Concurrent Polly requests per answer when synthesizing sentence chunks
+POLLY_CHUNK_WORKERS = 4
+
+def wav_header(sample_rate, data_size=0xFFFFFFFF - 36, channels=1, bits_per_sample=16):
+    """
+    RIFF/WAVE header for PCM audio. Without a data_size the sizes are set to the
+    maximum, which players treat as "read until end of stream".
+    """
+    byte_rate = sample_rate * channels * bits_per_sample // 8
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", data_size + 36, b"WAVE", b"fmt ", 16, 1, channels, sample_rate,
+        byte_rate, channels * bits_per_sample // 8, bits_per_sample, b"data", data_size,
+    )
+
+def synthesize_speech_stream(text, voice_id="Joanna", region="us-east-1"):
+    """
+    Synthesize speech sentence by sentence.
+
+    Returns (mimetype, chunks) where chunks yields audio bytes in playback order as
+    soon as each sentence is ready. Online, sentences are sent to Polly concurrently
+    and the MP3 frames are concatenated; offline, a streaming WAV header is followed
+    by raw PCM from the local model.
+    """
     logger = logging.getLogger('medical_app')
-    try:
-        output_audio_path = "output_response.wav"
-        if not is_connected():
-            logger.info("Using offline TTS")
-            audio_file = run_tts(text, output_audio_path)
-            return audio_file 
-        
-        logger.info(f"Using online TTS with voice: {voice_id}")
-        polly = boto3.client("polly", region_name=region)
+    if not is_connected("polly"):
+        logger.info("Using offline TTS")
+
+        def offline_chunks():
+            yield wav_header(OFFLINE_SAMPLE_RATE)
+            yield from run_tts_stream(text)
+
+        return "audio/wav", offline_chunks()
+
+    logger.info(f"Using online TTS with voice: {voice_id}")
+    polly = get_client("polly", region_name=region)
+
+    def polly_synthesize(chunk):
         response = polly.synthesize_speech(
-            Text=text,
+            Text=chunk,
             OutputFormat="mp3",
             VoiceId=voice_id
         )
-        audio_stream = response["AudioStream"].read()
-        audio_base64 = base64.b64encode(audio_stream).decode("utf-8")
+        return response["AudioStream"].read()
+
+    def synthesize(chunk):
+        return cached_synthesis(chunk, voice_id, "polly", "mp3", polly_synthesize)
+
+    return "audio/mpeg", ordered_pipeline(split_sentences(text), synthesize, workers=POLLY_CHUNK_WORKERS)
+
+def synthesize_speech(text, voice_id="Joanna", region="us-east-1"):
+    """Synthesize speech and return (audio bytes, mimetype)"""
+    mimetype, chunks = synthesize_speech_stream(text, voice_id=voice_id, region=region)
+    if mimetype == "audio/wav":
+        next(chunks)  # Replace the streaming header with one carrying the real sizes
+        pcm = b"".join(chunks)
+        return wav_header(OFFLINE_SAMPLE_RATE, len(pcm)) + pcm, mimetype
+    return b"".join(chunks), mimetype
+
+def synthesize_speech_base64(text, voice_id="Joanna", region="us-east-1"):
+    """Synthesize speech and return base64 encoded audio"""
+    logger = logging.getLogger('medical_app')
+    try:
+        audio_bytes, _ = synthesize_speech(text, voice_id=voice_id, region=region)
+        audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
         return audio_base64
-        
+
     except Exception as e:
         logger.error(f"Error in speech synthesis: {e}")
-        return None
\ No newline at end of file
+        return None
+
+class _AudioJobs:
+    """
+    Runs speech synthesis off the request path and keeps the results for a while,
+    so answers can be returned immediately and their audio fetched by id later.
+    At most `max_pending` jobs wait or run at once, and jobs evicted before they
+    start are cancelled rather than synthesized for nobody.
+    """
+
+    def __init__(self, workers=AUDIO_WORKERS, ttl=AUDIO_TTL, max_jobs=AUDIO_MAX_JOBS,
+                 max_pending=AUDIO_MAX_PENDING):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, text, voice_id):
+        audio_id = str(uuid.uuid4())
+        job = {"status": "pending", "audio": None, "mimetype": None, "error": None,
+               "created_at": time.time(), "done": threading.Event(), "future": None}
+        with self._lock:
+            self._evict()
+            if sum(1 for other in self._jobs.values() if other["status"] == "pending") >= self.max_pending:
+                raise RuntimeError("Too many pending speech synthesis jobs")
+            job["future"] = self._executor.submit(self._run, job, text, voice_id)
+            self._jobs[audio_id] = job
+            self._evict()
+        return audio_id
+
+    def _run(self, job, text, voice_id):
+        try:
+            job["audio"], job["mimetype"] = synthesize_speech(text, voice_id=voice_id)
+            job["status"] = "ready"
+        except Exception as e:
+            logging.getLogger('medical_app').error(f"Error in background speech synthesis: {e}")
+            job["error"] = str(e)
+            job["status"] = "error"
+        finally:
+            job["done"].set()
+
+    def _evict(self):
+        cutoff = time.time() - self.ttl
+        while self._jobs:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if len(self._jobs) > self.max_jobs or oldest["created_at"] < cutoff:
+                self._jobs.pop(oldest_id)
+                if oldest["future"].cancel():
+                    oldest["error"] = "Speech synthesis cancelled"
+                    oldest["status"] = "error"
+                    oldest["done"].set()
+            else:
+                break
+
+    def get(self, audio_id, timeout=0):
+        """Return the job for an id (waiting up to `timeout` seconds for it to finish), or None"""
+        with self._lock:
+            self._evict()
+            job = self._jobs.get(audio_id)
+        if job is not None and timeout:
+            job["done"].wait(timeout)
+        return job
+
+_audio_jobs = _AudioJobs()
+
+def submit_speech(text, voice_id="Joanna"):
+    """
+    Start synthesizing speech in the background and return an audio id.
+    Raises RuntimeError when AUDIO_MAX_PENDING jobs are already queued.
+    """
+    return _audio_jobs.submit(text, voice_id)
+
+def get_speech(audio_id, timeout=0):
+    """
+    Return the background synthesis job for an audio id, or None if unknown/expired.
+    The job dict has status ("pending", "ready" or "error"), audio, mimetype and error.
+    """
+    return _audio_jobs.get(audio_id, timeout=timeout)
@@ -0,0 +1,80 @@
+import io
+import os
+import wave
+import logging
+import tempfile
+import subprocess
+from contextlib import contextmanager
+import numpy as np
+
+logger = logging.getLogger('medical_app')
+
+SAMPLE_RATE = 16000
+FFMPEG_TIMEOUT = float(os.getenv("FFMPEG_TIMEOUT", "120"))
+
+@contextmanager
+def temporary_file(data, suffix=""):
+    """Write bytes to a temp file for the duration of the block; the file is always deleted"""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        yield path
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+def _ffmpeg_to_pcm(source, data=None, sample_rate=SAMPLE_RATE):
+    result = subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-loglevel", "error",
+            "-i", source,
+            "-vn",  # disable video
+            "-f", "s16le",
+            "-acodec", "pcm_s16le",
+            "-ar", str(sample_rate),
+            "-ac", "1",
+            "pipe:1",
+        ],
+        input=data,
+        capture_output=True,
+        check=True,
+        timeout=FFMPEG_TIMEOUT,
+    )
+    return result.stdout
+
+def decode_audio(data, sample_rate=SAMPLE_RATE, suffix=".webm"):
+    """
+    Decode an uploaded audio file to mono 16-bit PCM at `sample_rate`, in memory.
+
+    The upload is piped into ffmpeg and raw samples are read back from its stdout.
+    Containers that cannot be read from a pipe (e.g. MP4 with the index at the end)
+    fall back to a temp file that is removed as soon as decoding finishes.
+
+    Returns:
+        int16 NumPy array of samples
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg cannot decode the audio
+    """
+    try:
+        pcm = _ffmpeg_to_pcm("pipe:0", data, sample_rate)
+    except subprocess.CalledProcessError as e:
+        logger.info(f"Decoding from pipe failed ({e.stderr.decode(errors='replace').strip()[:200]}), retrying from a temp file")
+        with temporary_file(data, suffix=suffix) as path:
+            pcm = _ffmpeg_to_pcm(path, sample_rate=sample_rate)
+    return np.frombuffer(pcm, dtype=np.int16)
+
+def pcm16_to_float32(samples):
+    """Scale int16 samples to the [-1, 1) float32 range expected by whisper models"""
+    return samples.astype(np.float32) / 32768.0
+
+def pcm16_to_wav_bytes(samples, sample_rate=SAMPLE_RATE):
+    """Wrap int16 samples in an in-memory WAV file"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
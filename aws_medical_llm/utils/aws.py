@@ -0,0 +1,39 @@
+import os
+import threading
+import boto3
+from botocore.config import Config
+
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "32"))
+AWS_MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "3"))
+AWS_CONNECT_TIMEOUT = float(os.getenv("AWS_CONNECT_TIMEOUT", "5"))
+AWS_READ_TIMEOUT = float(os.getenv("AWS_READ_TIMEOUT", "60"))
+
+_session = boto3.session.Session()
+_clients = {}
+_lock = threading.Lock()
+
+def get_client(service_name, region_name="us-east-1", read_timeout=AWS_READ_TIMEOUT):
+    """
+    Return a shared boto3 client for a service and region.
+
+    Clients are created once (credential and endpoint resolution happen only then)
+    and reused by every thread; their connection pool keeps TLS connections alive
+    between calls. boto3 sessions are not thread-safe, so creation is serialized.
+    """
+    key = (service_name, region_name, read_timeout)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            config = Config(
+                max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+                retries={"max_attempts": AWS_MAX_ATTEMPTS, "mode": "standard"},
+                connect_timeout=AWS_CONNECT_TIMEOUT,
+                read_timeout=read_timeout,
+                tcp_keepalive=True,
+            )
+            client = _session.client(service_name, region_name=region_name, config=config)
+            _clients[key] = client
+        return client
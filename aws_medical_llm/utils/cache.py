@@ -0,0 +1,106 @@
+import time
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Disk-backed caches trim expired and excess rows every this many writes
+DISK_PRUNE_EVERY = 256
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with optional TTL and disk backing.
+
+    When `disk_path` is given, entries are also written to a SQLite file so they
+    survive restarts; a memory miss falls back to disk before counting as a miss.
+    Values must be picklable when disk-backed.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None, disk_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = str(disk_path) if disk_path else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self._disk_writes = 0
+        if self.disk_path:
+            self._disk().execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+
+    def _disk(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.disk_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+        if self.disk_path:
+            row = self._disk().execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and (row[1] is None or row[1] > now):
+                value = pickle.loads(row[0])
+                self._remember(key, value, row[1])
+                with self._lock:
+                    self.hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl if self.ttl else None
+        self._remember(key, value, expires_at)
+        if self.disk_path:
+            disk = self._disk()
+            disk.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, pickle.dumps(value), expires_at),
+            )
+            with self._lock:
+                self._disk_writes += 1
+                prune = self._disk_writes % DISK_PRUNE_EVERY == 0
+            if prune:
+                # Drop expired rows and keep only the most recently written max_entries
+                disk.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+                disk.execute(
+                    "DELETE FROM cache WHERE rowid NOT IN (SELECT rowid FROM cache ORDER BY rowid DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk_path:
+            self._disk().execute("DELETE FROM cache")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
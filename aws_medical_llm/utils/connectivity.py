@@ -1,12 +1,188 @@
+import os
 import socket
-def is_connected(host="8.8.8.8", port=53, timeout=3):
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+AWS_REGION = "us-east-1"
+
+# Dependency name -> (host, port) probed with a plain TCP connect
+DEFAULT_PROBES = {
+    "internet": ("8.8.8.8", 53),
+    "bedrock": (f"bedrock-runtime.{AWS_REGION}.amazonaws.com", 443),
+    "polly": (f"polly.{AWS_REGION}.amazonaws.com", 443),
+    "translate": (f"translate.{AWS_REGION}.amazonaws.com", 443),
+    "textract": (f"textract.{AWS_REGION}.amazonaws.com", 443),
+    "pinecone": ("api.pinecone.io", 443),
+    "openai": ("api.openai.com", 443),
+}
+
+CONNECTIVITY_INTERVAL = float(os.getenv("CONNECTIVITY_INTERVAL", "10"))
+CONNECTIVITY_TTL = float(os.getenv("CONNECTIVITY_TTL", "30"))
+CONNECTIVITY_TIMEOUT = float(os.getenv("CONNECTIVITY_TIMEOUT", "2"))
+CONNECTIVITY_THRESHOLD = int(os.getenv("CONNECTIVITY_THRESHOLD", "2"))
+
+logger = logging.getLogger('medical_app')
+
+# getaddrinfo has no timeout of its own, so lookups run here and are waited on with one
+_resolver = ThreadPoolExecutor(max_workers=8, thread_name_prefix="connectivity-dns")
+
+def probe(host="8.8.8.8", port=53, timeout=3):
     """
-    Check internet connection by trying to connect to DNS server.
+    Check reachability by resolving the host and opening (and closing) a TCP connection.
+    DNS resolution and connecting share `timeout`, so a stalled resolver cannot block longer.
     Returns True if connected, False otherwise.
     """
+    deadline = time.monotonic() + timeout
     try:
-        socket.setdefaulttimeout(timeout)
-        socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect((host, port))
-        return True
-    except socket.error:
-        return False
\ No newline at end of file
+        addresses = _resolver.submit(socket.getaddrinfo, host, port, type=socket.SOCK_STREAM).result(timeout)
+    except (FutureTimeoutError, OSError):
+        return False
+    for family, socktype, proto, _, address in addresses:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        try:
+            with socket.socket(family, socktype, proto) as sock:
+                sock.settimeout(remaining)
+                sock.connect(address)
+                return True
+        except OSError:
+            continue
+    return False
+
+class ConnectivityMonitor:
+    """
+    Background monitor that keeps a cached online/offline state per dependency.
+
+    A state only flips after `threshold` consecutive probes disagree with it
+    (hysteresis), so a single dropped packet doesn't bounce requests between
+    the online and offline pipelines. Reads never touch the network: when the
+    cached state is older than `ttl` (e.g. the monitor thread is not running) the
+    last known state is returned and a refresh is started in the background.
+    """
+
+    def __init__(self, probes=None, interval=CONNECTIVITY_INTERVAL, ttl=CONNECTIVITY_TTL,
+                 timeout=CONNECTIVITY_TIMEOUT, threshold=CONNECTIVITY_THRESHOLD):
+        self.probes = dict(probes or DEFAULT_PROBES)
+        self.interval = interval
+        self.ttl = ttl
+        self.timeout = timeout
+        self.threshold = max(1, threshold)
+        self._states = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._checked_at = 0.0
+
+    def start(self):
+        """Run one synchronous probe round, then keep refreshing in a daemon thread"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="connectivity-monitor", daemon=True)
+        self.refresh()
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Connectivity refresh failed: {e}")
+
+    def refresh(self):
+        """Probe every dependency concurrently and apply the results"""
+        with self._refresh_lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self):
+        names = list(self.probes)
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            results = list(executor.map(lambda name: probe(*self.probes[name], timeout=self.timeout), names))
+        now = time.time()
+        with self._lock:
+            for name, reachable in zip(names, results):
+                self._apply(name, reachable, now)
+            self._checked_at = now
+
+    def _apply(self, name, reachable, now):
+        state = self._states.get(name)
+        if state is None:
+            # First observation is taken as-is
+            self._states[name] = {"online": reachable, "streak": 0, "changed_at": now}
+            return
+        if reachable == state["online"]:
+            state["streak"] = 0
+            return
+        state["streak"] += 1
+        if state["streak"] >= self.threshold:
+            state["online"] = reachable
+            state["streak"] = 0
+            state["changed_at"] = now
+            logger.info(f"Connectivity for {name} changed to {'online' if reachable else 'offline'}")
+
+    def _refresh_in_background(self):
+        try:
+            if time.time() - self._checked_at > self.ttl:
+                self._refresh_locked()
+        except Exception as e:
+            logger.error(f"Connectivity refresh failed: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def is_online(self, name="internet"):
+        """
+        Return the cached state for a dependency
+
+        Raises:
+            KeyError: If `name` is not a probed dependency
+        """
+        if name not in self.probes:
+            raise KeyError(f"Unknown connectivity dependency: {name}")
+        if time.time() - self._checked_at > self.ttl:
+            if not self._states:
+                # Never probed: there is no last known state to serve
+                self.refresh()
+            elif self._refresh_lock.acquire(blocking=False):
+                # Stale cache: serve the last known state while one background thread refreshes
+                threading.Thread(target=self._refresh_in_background, name="connectivity-refresh",
+                                 daemon=True).start()
+        with self._lock:
+            state = self._states.get(name)
+            return state["online"] if state else False
+
+    def status(self):
+        """Return a snapshot of all dependency states"""
+        with self._lock:
+            return {
+                "checked_at": self._checked_at,
+                "dependencies": {name: state["online"] for name, state in self._states.items()},
+            }
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+def get_connectivity_monitor():
+    """Return the shared monitor, starting it on first call"""
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                monitor = ConnectivityMonitor()
+                monitor.start()
+                _monitor = monitor
+    return _monitor
+
+def is_connected(dependency="internet"):
+    """
+    Return whether a dependency (default: general internet) is currently reachable.
+    Reads the monitor's cached state instead of probing on every call.
+    """
+    return get_connectivity_monitor().is_online(dependency)
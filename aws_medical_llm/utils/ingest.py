@@ -0,0 +1,275 @@
+import os
+import json
+import hashlib
+import sqlite3
+import time
+import logging
+import threading
+import numpy as np
+from itertools import islice
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from utils.retriever import LocalVectorIndex
+
+logger = logging.getLogger('medical_app')
+
+ENCODE_BATCH_SIZE = int(os.getenv("INGEST_ENCODE_BATCH_SIZE", "256"))
+UPSERT_BATCH_SIZE = int(os.getenv("INGEST_UPSERT_BATCH_SIZE", "100"))
+UPLOAD_WORKERS = int(os.getenv("INGEST_UPLOAD_WORKERS", "4"))
+MAX_PENDING_BATCHES = int(os.getenv("INGEST_MAX_PENDING_BATCHES", "8"))
+
+class PineconeSink:
+    """Upserts vectors into a Pinecone index"""
+
+    def __init__(self, index, namespace=None):
+        self.index = index
+        self.namespace = namespace
+
+    def upsert(self, records):
+        """Upsert a list of (id, values, metadata) tuples in one request"""
+        self.index.upsert(vectors=records, namespace=self.namespace)
+
+    def delete(self, ids):
+        self.index.delete(ids=list(ids), namespace=self.namespace)
+
+    def finalize(self):
+        pass
+
+class LocalIndexSink:
+    """
+    Stages vectors on disk and builds a LocalVectorIndex on finalize().
+    Staged batches survive interruptions, so a resumed run only encodes what is missing.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.staging_dir = self.directory / "_staging"
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self._deleted_path = self.staging_dir / "deleted.json"
+        self._deleted = set()
+        self._lock = threading.Lock()
+        # Staged files are named <run>-<sequence> so no batch ever overwrites another
+        self._run_id = time.time_ns()
+        self._sequence = 0
+        if self._deleted_path.exists():
+            with open(self._deleted_path, 'r', encoding='utf-8') as f:
+                self._deleted = set(json.load(f))
+
+    def _save_deleted(self):
+        with open(self._deleted_path, 'w', encoding='utf-8') as f:
+            json.dump(sorted(self._deleted), f)
+
+    def delete(self, ids):
+        """Tombstone ids so finalize() leaves them out of the index"""
+        with self._lock:
+            self._deleted.update(ids)
+            self._save_deleted()
+
+    def upsert(self, records):
+        ids = [record[0] for record in records]
+        with self._lock:
+            if self._deleted.intersection(ids):
+                self._deleted.difference_update(ids)
+                self._save_deleted()
+            self._sequence += 1
+            staged = self.staging_dir / f"{self._run_id}-{self._sequence:08d}.npz"
+        vectors = np.asarray([record[1] for record in records], dtype=np.float32)
+        metadata = json.dumps([record[2] for record in records], ensure_ascii=False)
+        np.savez(staged, ids=np.asarray(ids), vectors=vectors, metadata=np.asarray(metadata))
+
+    def finalize(self):
+        # Keyed by id so batches re-staged by a resumed run replace earlier copies
+        rows = {}
+        for staged in sorted(self.staging_dir.glob("*.npz"), key=lambda path: (path.stat().st_mtime, path.name)):
+            with np.load(staged) as batch:
+                for vector_id, vector, metadata in zip(batch["ids"].tolist(), batch["vectors"],
+                                                       json.loads(str(batch["metadata"]))):
+                    rows[vector_id] = (vector, metadata)
+        for vector_id in self._deleted:
+            rows.pop(vector_id, None)
+        if rows:
+            ids = list(rows)
+            LocalVectorIndex.build(self.directory, ids, np.stack([rows[i][0] for i in ids]), [rows[i][1] for i in ids])
+
+class Checkpoint:
+    """
+    Per-prefix resume point stored as JSON.
+
+    Batches may finish out of order, so the saved value is the watermark below
+    which every row has been uploaded.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._positions = {}
+        self._completed = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._positions = json.load(f)
+
+    def position(self, prefix):
+        return self._positions.get(prefix, 0)
+
+    def complete(self, prefix, start, end):
+        with self._lock:
+            completed = self._completed.setdefault(prefix, {})
+            completed[start] = end
+            position = self._positions.get(prefix, 0)
+            while position in completed:
+                position = completed.pop(position)
+            self._positions[prefix] = position
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._positions, f)
+            os.replace(tmp_path, self.path)
+
+class Manifest:
+    """
+    SQLite record of the content hash last ingested for every vector id.
+    Lets re-runs skip unchanged rows and find rows that vanished from a dataset.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS manifest (prefix TEXT NOT NULL, id TEXT NOT NULL, hash TEXT NOT NULL, "
+            "PRIMARY KEY (prefix, id))"
+        )
+        self._conn.commit()
+
+    def load(self, prefix):
+        """Return {id: hash} for every vector ingested under a prefix"""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, hash FROM manifest WHERE prefix = ?", (prefix,)).fetchall()
+        return dict(rows)
+
+    def update(self, prefix, entries):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO manifest (prefix, id, hash) VALUES (?, ?, ?)",
+                [(prefix, vector_id, content_hash) for vector_id, content_hash in entries],
+            )
+            self._conn.commit()
+
+    def remove(self, prefix, ids):
+        with self._lock:
+            self._conn.executemany("DELETE FROM manifest WHERE prefix = ? AND id = ?", [(prefix, i) for i in ids])
+            self._conn.commit()
+
+def content_hash(text, metadata):
+    """Stable hash of the embedded text and its metadata"""
+    payload = json.dumps([text, metadata], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def ingest(rows, prefix, text_fn, meta_fn, encoder, sink, limit=None, checkpoint=None,
+           manifest=None, id_fn=None,
+           encode_batch_size=ENCODE_BATCH_SIZE, upsert_batch_size=UPSERT_BATCH_SIZE,
+           upload_workers=UPLOAD_WORKERS, max_pending=MAX_PENDING_BATCHES):
+    """
+    Stream rows through batched encoding and concurrent batched upserts.
+
+    The calling thread encodes one batch at a time while a worker pool uploads
+    previous batches; at most `max_pending` encoded batches wait for upload, so a
+    slow sink throttles encoding instead of buffering the whole dataset.
+
+    Args:
+        rows: Iterable of dataset rows
+        prefix: Vector id prefix (ids are f"{prefix}-{row_number}")
+        text_fn: Row -> text to embed
+        meta_fn: Row -> metadata dict
+        encoder: Object with encode(texts, batch_size=...) returning an array
+        sink: PineconeSink or LocalIndexSink
+        limit: Stop after this many rows (None for all)
+        checkpoint: Optional Checkpoint to resume from and record progress in
+        manifest: Optional Manifest for incremental runs: only new or changed rows
+            are encoded and upserted, and (on a full run without `limit`) ids that
+            are no longer in the dataset are deleted from the sink. An interrupted
+            incremental run resumes naturally, so it does not take a checkpoint.
+        id_fn: Row -> stable key used for ids in incremental runs; defaults to the
+            content hash, so edited rows replace their old vector
+
+    Returns:
+        Number of rows encoded and upserted in this run
+    """
+    if manifest is not None and checkpoint is not None:
+        raise ValueError("Incremental ingestion resumes from the manifest; do not pass a checkpoint")
+    start = checkpoint.position(prefix) if checkpoint else 0
+    if start:
+        logger.info(f"Resuming {prefix} ingestion at row {start}")
+    if limit is not None and start >= limit:
+        return 0
+
+    pending = threading.BoundedSemaphore(max_pending)
+    errors = []
+    done_rows = 0
+    done_lock = threading.Lock()
+    started_at = time.time()
+
+    known = manifest.load(prefix) if manifest is not None else {}
+    seen = set()
+
+    def pending_items():
+        """Yield (row_number, id, text, metadata, hash) for rows that need uploading"""
+        for row_number, row in enumerate(islice(rows, start, limit), start):
+            text, metadata = text_fn(row), meta_fn(row)
+            if manifest is None:
+                yield row_number, f"{prefix}-{row_number}", text, metadata, None
+                continue
+            row_hash = content_hash(text, metadata)
+            vector_id = f"{prefix}-{id_fn(row) if id_fn else row_hash[:16]}"
+            seen.add(vector_id)
+            if known.get(vector_id) != row_hash:
+                yield row_number, vector_id, text, metadata, row_hash
+
+    def upload(batch_start, records, hashes):
+        nonlocal done_rows
+        try:
+            for i in range(0, len(records), upsert_batch_size):
+                sink.upsert(records[i:i + upsert_batch_size])
+            if checkpoint:
+                checkpoint.complete(prefix, batch_start, batch_start + len(records))
+            if manifest is not None:
+                manifest.update(prefix, [(record[0], row_hash) for record, row_hash in zip(records, hashes)])
+            with done_lock:
+                done_rows += len(records)
+                rate = done_rows / max(time.time() - started_at, 1e-9)
+            logger.info(f"{prefix}: {done_rows} rows ingested ({rate:.1f} rows/s)")
+        except Exception as e:
+            errors.append(e)
+        finally:
+            pending.release()
+
+    with ThreadPoolExecutor(max_workers=upload_workers) as executor:
+        for batch in _batches(pending_items(), encode_batch_size):
+            if errors:
+                break
+            vectors = encoder.encode([item[2] for item in batch], batch_size=encode_batch_size)
+            records = [(item[1], vectors[i].tolist(), item[3]) for i, item in enumerate(batch)]
+            pending.acquire()
+            executor.submit(upload, batch[0][0], records, [item[4] for item in batch])
+
+    if errors:
+        raise errors[0]
+
+    if manifest is not None and limit is None:
+        vanished = [vector_id for vector_id in known if vector_id not in seen]
+        for i in range(0, len(vanished), upsert_batch_size):
+            chunk = vanished[i:i + upsert_batch_size]
+            sink.delete(chunk)
+            manifest.remove(prefix, chunk)
+        logger.info(f"{prefix}: {len(seen) - done_rows} unchanged, {done_rows} upserted, {len(vanished)} deleted")
+
+    elapsed = time.time() - started_at
+    logger.info(f"{prefix}: finished {done_rows} rows in {elapsed:.1f}s ({done_rows / max(elapsed, 1e-9):.1f} rows/s)")
+    return done_rows
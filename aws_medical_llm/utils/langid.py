@@ -0,0 +1,82 @@
+import time
+import threading
+from utils.cache import LRUCache
+from utils.script import script_proportions
+
+# Share of letters that must be Devanagari for text to be treated as Hindi
+DEVANAGARI_THRESHOLD = 0.3
+# langdetect's accuracy plateaus long before this; longer inputs only cost time
+DETECT_MAX_CHARS = 1000
+DETECT_CACHE_SIZE = 4096
+
+_detect_cache = LRUCache(max_entries=DETECT_CACHE_SIZE)
+_detector_factory = None
+_load_lock = threading.Lock()
+
+def load():
+    """Load langdetect's language profiles once, with a fixed seed so results are deterministic"""
+    global _detector_factory
+    if _detector_factory is not None:
+        return _detector_factory
+    with _load_lock:
+        if _detector_factory is None:
+            from langdetect import detector_factory
+            detector_factory.DetectorFactory.seed = 0
+            detector_factory.init_factory()
+            _detector_factory = detector_factory._factory
+    return _detector_factory
+
+def detect_language(text):
+    """
+    Return the ISO 639-1 code of the text's language, or "unknown".
+
+    Text written mostly in Devanagari is classified as Hindi without running the
+    statistical detector, and text without any letters is "unknown"; other text
+    goes to langdetect (truncated to DETECT_MAX_CHARS). Results are cached, since detection is deterministic.
+    """
+    sample = (text or "").strip()[:DETECT_MAX_CHARS]
+    proportions = script_proportions(sample)
+    if not proportions and not any(ch.isalpha() for ch in sample):
+        return "unknown"
+    if proportions.get("devanagari", 0.0) >= DEVANAGARI_THRESHOLD:
+        return "hi"
+
+    language = _detect_cache.get(sample)
+    if language is None:
+        try:
+            detector = load().create()
+            detector.append(sample)
+            language = detector.detect()
+        except Exception:
+            language = "unknown"
+        _detect_cache.set(sample, language)
+    return language
+
+def benchmark(texts, repeat=100):
+    """Return per-call detection latency in milliseconds (uncached) for a list of texts"""
+    load()
+    timings = []
+    for _ in range(repeat):
+        for text in texts:
+            _detect_cache.clear()
+            started = time.perf_counter()
+            detect_language(text)
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "calls": len(timings),
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95)], 3),
+    }
+
+if __name__ == "__main__":
+    samples = [
+        "What are the symptoms of type 2 diabetes?",
+        "मुझे दो दिन से बुखार और सिरदर्द है, क्या करूँ?",
+        "¿Cuáles son los síntomas de la diabetes?",
+        "Patient presents with chest pain radiating to the left arm. " * 40,
+    ]
+    for sample in samples:
+        print(f"{detect_language(sample)!r:10} {sample[:50]}")
+    print(benchmark(samples))
@@ -1,22 +1,114 @@
-import boto3
+import os
+import re
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from utils.aws import get_client
+from utils.cache import LRUCache
+
+# Sentence ends: Latin punctuation or the Devanagari danda, followed by whitespace
+SENTENCE_END = re.compile(r'(?<=[.!?\u0964])\s+')
+# Paragraph breaks are kept verbatim between translated segments
+PARAGRAPH_BREAK = re.compile(r'(\n\s*)')
+
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "8192"))
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH")  # optional SQLite file to persist translations
+TRANSLATE_WORKERS = int(os.getenv("TRANSLATE_WORKERS", "4"))
+# AWS Translate accepts 10,000 bytes per request; Devanagari is 3 bytes per character in UTF-8
+TRANSLATE_MAX_SEGMENT_CHARS = 3000
+
+translation_cache = LRUCache(max_entries=TRANSLATION_CACHE_SIZE, disk_path=TRANSLATION_CACHE_PATH)
+_executor = ThreadPoolExecutor(max_workers=TRANSLATE_WORKERS, thread_name_prefix="translate")
+
+def _segments(text):
+    """
+    Split text into (segment, translate?) pairs. Consecutive paragraphs are packed
+    into segments of up to TRANSLATE_MAX_SEGMENT_CHARS, so OCR output with one line
+    per paragraph costs few requests, and the packing is deterministic so repeated
+    text hits the cache. Only overlong paragraphs are split, into sentences.
+    Whitespace between segments is kept as-is.
+    """
+    segments = []
+    group, gap = "", ""
+    for part in PARAGRAPH_BREAK.split(text):
+        if not part.strip():
+            gap += part
+            continue
+        sentences = SENTENCE_END.split(part) if len(part) > TRANSLATE_MAX_SEGMENT_CHARS else [part]
+        for i, sentence in enumerate(sentences):
+            separator = gap if i == 0 else " "
+            if group and len(group) + len(separator) + len(sentence) <= TRANSLATE_MAX_SEGMENT_CHARS:
+                group += separator + sentence
+                continue
+            if group:
+                segments.append((group, True))
+            if separator:
+                segments.append((separator, False))
+            group = sentence
+        gap = ""
+    if group:
+        segments.append((group, True))
+    if gap:
+        segments.append((gap, False))
+    return segments
+
+def _cache_key(text, source_lang, target_lang):
+    return f"{source_lang}:{target_lang}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+def _translate_segment(text, source_lang, target_lang):
+    key = _cache_key(text, source_lang, target_lang)
+    translated = translation_cache.get(key)
+    if translated is None:
+        result = get_client('translate', region_name='us-east-1').translate_text(
+            Text=text,
+            SourceLanguageCode=source_lang,
+            TargetLanguageCode=target_lang
+        )
+        translated = result['TranslatedText']
+        translation_cache.set(key, translated)
+    return translated
 
 def translate_text(text, source_lang, target_lang):
     """
     Translate text using AWS Translate.
     Assumes internet is available.
+
+    Text is translated in segments of packed paragraphs; each segment is cached on
+    its own, so repeated content (e.g. the same uploaded file) is not translated
+    again, and uncached segments are translated concurrently.
     """
     logger = logging.getLogger('medical_app')
 
     try:
         logger.info(f"Translating text from {source_lang} to {target_lang}")
-        translate = boto3.client(service_name='translate', region_name='us-east-1')
-        result = translate.translate_text(
-            Text=text,
-            SourceLanguageCode=source_lang,
-            TargetLanguageCode=target_lang
-        )
-        return result['TranslatedText']
+        segments = _segments(text)
+        pending = [segment for segment, translate in segments if translate]
+        if len(pending) <= 1:
+            translated = iter([_translate_segment(segment, source_lang, target_lang) for segment in pending])
+        else:
+            translated = _executor.map(lambda segment: _translate_segment(segment, source_lang, target_lang), pending)
+        return "".join(next(translated) if translate else segment for segment, translate in segments)
     except Exception as e:
         logger.error(f"Translation error: {e}")
-        return text  # Return original text if translation fails
\ No newline at end of file
+        return text  # Return original text if translation fails
+
+def translation_cache_stats():
+    return translation_cache.stats()
+
+def translate_stream(chunks, source_lang, target_lang):
+    """
+    Translate a stream of text chunks sentence by sentence.
+    Each sentence is yielded as soon as it is complete, so translated output
+    keeps streaming instead of waiting for the whole text.
+    """
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        parts = SENTENCE_END.split(buffer)
+        # The last part may be an unfinished sentence
+        buffer = parts.pop()
+        for sentence in parts:
+            if sentence.strip():
+                yield translate_text(sentence, source_lang, target_lang) + " "
+    if buffer.strip():
+        yield translate_text(buffer, source_lang, target_lang)
@@ -0,0 +1,249 @@
+import os
+import json
+import mmap
+import time
+import shutil
+import logging
+import threading
+import numpy as np
+from pathlib import Path
+
+logger = logging.getLogger('medical_app')
+
+# Corpora at or above this size get an IVF (inverted file) index instead of brute force
+IVF_MIN_VECTORS = 50000
+IVF_NPROBE = 8
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+BUILD_CHUNK_SIZE = 65536
+
+class PineconeRetriever:
+    """Retriever backed by a remote Pinecone index"""
+
+    name = "pinecone"
+
+    def __init__(self, index):
+        self.index = index
+
+    def query(self, vector, top_k=5, namespace=None):
+        """Return the top_k matches as dicts with id, score and metadata"""
+        results = self.index.query(
+            vector=vector,
+            top_k=top_k,
+            include_metadata=True,
+            namespace=namespace
+        )
+        return [
+            {"id": match.get("id"), "score": match.get("score"), "metadata": match.get("metadata", {})}
+            for match in results['matches']
+        ]
+
+class LocalVectorIndex:
+    """
+    Cosine-similarity vector index stored as memory-mapped files. index.json
+    (dimension, count, IVF list count and version) names the version directory
+    holding the data:
+
+        vectors.npy       float32 (count x dimension), L2-normalized
+        metadata.jsonl    one {"id", "metadata"} record per vector row
+        metadata_offsets.npy  int64 byte offsets of each metadata line (count + 1)
+        centroids.npy     IVF only: float32 (nlist x dimension)
+        list_offsets.npy  IVF only: int64 row offsets of each inverted list (nlist + 1)
+
+    Small corpora are searched by brute force; large ones are built as IVF, with
+    rows stored grouped by list so probing a list is a contiguous slice.
+
+    Each build writes its data files to a new version directory and then swaps
+    index.json to point at it, so a rebuild never touches files a running
+    server has memory-mapped. Indexes from before versioning keep their data
+    files next to index.json.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        with open(self.directory / "index.json", 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        self.version = info.get("version")
+        data_dir = self.directory / self.version if self.version else self.directory
+        self.dimension = info["dimension"]
+        self.count = info["count"]
+        self.nlist = info.get("nlist", 0)
+        self.vectors = np.load(data_dir / "vectors.npy", mmap_mode="r")
+        self.metadata_offsets = np.load(data_dir / "metadata_offsets.npy", mmap_mode="r")
+        self._metadata_file = open(data_dir / "metadata.jsonl", 'rb')
+        self._metadata = mmap.mmap(self._metadata_file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else b""
+        if self.nlist:
+            self.centroids = np.load(data_dir / "centroids.npy")
+            self.list_offsets = np.load(data_dir / "list_offsets.npy")
+
+    @staticmethod
+    def exists(directory):
+        return (Path(directory) / "index.json").exists()
+
+    @classmethod
+    def build(cls, directory, ids, vectors, metadatas, nlist=None):
+        """
+        Write a new index to `directory`, atomically replacing any existing one.
+
+        Args:
+            ids: Sequence of vector ids
+            vectors: Array-like (count x dimension) of embeddings
+            metadatas: Sequence of metadata dicts (should contain "text")
+            nlist: IVF list count; defaults to 4*sqrt(count) for large corpora, 0 (brute force) otherwise
+        """
+        directory = Path(directory)
+        version = f"_version-{time.time_ns()}"
+        data_dir = directory / version
+        data_dir.mkdir(parents=True)
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        count, dimension = vectors.shape if vectors.ndim == 2 else (0, 0)
+        if nlist is None:
+            nlist = int(4 * np.sqrt(count)) if count >= IVF_MIN_VECTORS else 0
+
+        order = np.arange(count)
+        if nlist:
+            centroids = _kmeans(vectors, nlist)
+            assignments = _assign(vectors, centroids)
+            order = np.argsort(assignments, kind="stable")
+            list_offsets = np.zeros(nlist + 1, dtype=np.int64)
+            np.cumsum(np.bincount(assignments, minlength=nlist), out=list_offsets[1:])
+            np.save(data_dir / "centroids.npy", centroids)
+            np.save(data_dir / "list_offsets.npy", list_offsets)
+
+        np.save(data_dir / "vectors.npy", vectors[order])
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        with open(data_dir / "metadata.jsonl", 'wb') as f:
+            for row, i in enumerate(order):
+                line = json.dumps({"id": ids[i], "metadata": metadatas[i]}, ensure_ascii=False).encode("utf-8") + b"\n"
+                f.write(line)
+                offsets[row + 1] = offsets[row] + len(line)
+        np.save(data_dir / "metadata_offsets.npy", offsets)
+
+        # Publishing index.json is the switch-over; readers see the old or the new version, never a mix
+        tmp_path = directory / "index.json.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"dimension": int(dimension), "count": int(count), "nlist": int(nlist), "metric": "cosine",
+                       "version": version}, f)
+        os.replace(tmp_path, directory / "index.json")
+        _remove_old_versions(directory, keep=version)
+        logger.info(f"Built local vector index at {directory}: {count} vectors, nlist={nlist}")
+        return cls(directory)
+
+    def _record(self, row):
+        start, end = int(self.metadata_offsets[row]), int(self.metadata_offsets[row + 1])
+        return json.loads(self._metadata[start:end])
+
+    def query(self, vector, top_k=5, nprobe=IVF_NPROBE):
+        """Return the top_k matches as dicts with id, score and metadata"""
+        if not self.count:
+            return []
+        query = _normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+        if self.nlist:
+            # Each inverted list is a contiguous slice, so score the probed slices directly
+            probe_lists = np.argsort(self.centroids @ query)[::-1][:nprobe]
+            spans = [(int(self.list_offsets[i]), int(self.list_offsets[i + 1])) for i in probe_lists]
+            rows = np.concatenate([np.arange(start, end) for start, end in spans])
+            scores = np.concatenate([self.vectors[start:end] @ query for start, end in spans])
+        else:
+            rows = None
+            scores = self.vectors @ query
+        k = min(top_k, len(scores))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        matches = []
+        for i in best:
+            row = int(i) if rows is None else int(rows[i])
+            record = self._record(row)
+            matches.append({"id": record["id"], "score": float(scores[i]), "metadata": record["metadata"]})
+        return matches
+
+class LocalRetriever:
+    """
+    Retriever backed by local memory-mapped indexes.
+    The default namespace lives in `root`; other namespaces in `root/<namespace>`.
+    """
+
+    name = "local"
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._indexes = {}  # namespace -> (index.json identity, index)
+        self._lock = threading.Lock()
+
+    def available(self, namespace=None):
+        return LocalVectorIndex.exists(self._directory(namespace))
+
+    def _directory(self, namespace):
+        return self.root / namespace if namespace else self.root
+
+    def _index(self, namespace):
+        """Return the open index for a namespace, reopening it if it was rebuilt since"""
+        directory = self._directory(namespace)
+        stat = os.stat(directory / "index.json")
+        # A rebuild replaces index.json, which gives it a new inode
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._indexes.get(namespace)
+            if cached is None or cached[0] != identity:
+                cached = (identity, LocalVectorIndex(directory))
+                self._indexes[namespace] = cached
+            return cached[1]
+
+    def query(self, vector, top_k=5, namespace=None):
+        return self._index(namespace).query(vector, top_k=top_k)
+
+def _remove_old_versions(directory, keep):
+    """
+    Delete superseded version directories, except the one before `keep`, which
+    servers that have not yet reopened may still be reading. Memory-mapped files
+    stay readable after deletion, so removing older ones is safe.
+    """
+    versions = sorted(path for path in Path(directory).glob("_version-*") if path.name != keep)
+    for path in versions[:-1]:
+        shutil.rmtree(path, ignore_errors=True)
+
+def _normalize(vectors):
+    if vectors.size == 0:
+        return vectors
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def _assign(vectors, centroids):
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), BUILD_CHUNK_SIZE):
+        chunk = vectors[start:start + BUILD_CHUNK_SIZE]
+        assignments[start:start + BUILD_CHUNK_SIZE] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+def _kmeans(vectors, nlist, seed=0):
+    """Spherical k-means on a sample of the corpus"""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * KMEANS_SAMPLE_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = _assign(sample, centroids)
+        for i in range(nlist):
+            members = sample[assignments == i]
+            if len(members):
+                centroids[i] = members.mean(axis=0)
+            else:
+                # Re-seed empty lists with a random sample vector
+                centroids[i] = sample[rng.integers(sample_size)]
+        centroids = _normalize(centroids)
+    return centroids.astype(np.float32)
+
+def export_pinecone_index(index, directory, namespace=None, batch_size=100):
+    """Copy every vector of a Pinecone (serverless) index namespace into a local index"""
+    ids, vectors, metadatas = [], [], []
+    for id_batch in index.list(namespace=namespace, limit=batch_size):
+        fetched = index.fetch(ids=list(id_batch), namespace=namespace)
+        for vector_id, vector in fetched.vectors.items():
+            ids.append(vector_id)
+            vectors.append(vector.values)
+            metadatas.append(vector.metadata or {})
+        logger.info(f"Exported {len(ids)} vectors from Pinecone")
+    return LocalVectorIndex.build(directory, ids, np.asarray(vectors, dtype=np.float32), metadatas)
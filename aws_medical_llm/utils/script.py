@@ -0,0 +1,82 @@
+import numpy as np
+
+# Letter ranges of each script (letters and their combining marks). Digits,
+# punctuation and symbols inside the Unicode blocks (e.g. Devanagari digits and
+# the danda, the Latin-1 signs U+00D7/U+00F7) are left out, as is everything
+# else, when computing proportions
+SCRIPT_RANGES = [
+    ("latin", 0x0041, 0x005A),
+    ("latin", 0x0061, 0x007A),
+    ("latin", 0x00C0, 0x00D6),
+    ("latin", 0x00D8, 0x00F6),
+    ("latin", 0x00F8, 0x024F),
+    ("greek", 0x0370, 0x037D),
+    ("greek", 0x037F, 0x0386),
+    ("greek", 0x0388, 0x03FF),
+    ("cyrillic", 0x0400, 0x0481),
+    ("cyrillic", 0x0483, 0x04FF),
+    ("hebrew", 0x0591, 0x05BD),
+    ("hebrew", 0x05C1, 0x05C2),
+    ("hebrew", 0x05C4, 0x05C5),
+    ("hebrew", 0x05C7, 0x05C7),
+    ("hebrew", 0x05D0, 0x05F2),
+    ("arabic", 0x0610, 0x061A),
+    ("arabic", 0x0620, 0x065F),
+    ("arabic", 0x066E, 0x06D3),
+    ("arabic", 0x06D5, 0x06EF),
+    ("arabic", 0x06FA, 0x06FF),
+    ("devanagari", 0x0900, 0x0963),
+    ("devanagari", 0x0971, 0x097F),
+    ("bengali", 0x0980, 0x09E5),
+    ("bengali", 0x09F0, 0x09F1),
+    ("gurmukhi", 0x0A00, 0x0A65),
+    ("gurmukhi", 0x0A70, 0x0A7F),
+    ("gujarati", 0x0A80, 0x0AE5),
+    ("gujarati", 0x0AF9, 0x0AFF),
+    ("tamil", 0x0B80, 0x0BE5),
+    ("telugu", 0x0C00, 0x0C65),
+    ("thai", 0x0E00, 0x0E3E),
+    ("thai", 0x0E40, 0x0E4E),
+    ("hangul", 0x1100, 0x11FF),
+    ("kana", 0x3041, 0x309F),
+    ("kana", 0x30A1, 0x30FA),
+    ("kana", 0x30FC, 0x30FF),
+    ("hangul", 0x3130, 0x318F),
+    ("cjk", 0x4E00, 0x9FFF),
+    ("devanagari", 0xA8E0, 0xA8F7),
+    ("devanagari", 0xA8FB, 0xA8FF),
+    ("hangul", 0xAC00, 0xD7AF),
+]
+SCRIPTS = sorted({name for name, _, _ in SCRIPT_RANGES})
+
+# Range boundaries as a sorted array: a code point in [starts[i], ends[i]] belongs to range i
+_ranges = sorted(SCRIPT_RANGES, key=lambda item: item[1])
+_starts = np.array([start for _, start, _ in _ranges], dtype=np.uint32)
+_ends = np.array([end for _, _, end in _ranges], dtype=np.uint32)
+_script_ids = np.array([SCRIPTS.index(name) for name, _, _ in _ranges], dtype=np.int64)
+
+def script_counts(text):
+    """Return {script: letter count} for the text in one vectorized pass"""
+    if not text:
+        return {}
+    # surrogatepass keeps lone surrogates (outside every range) from raising
+    codepoints = np.frombuffer(text.encode("utf-32-le", errors="surrogatepass"), dtype=np.uint32)
+    slot = np.searchsorted(_starts, codepoints, side="right") - 1
+    in_range = (slot >= 0) & (codepoints <= _ends[np.maximum(slot, 0)])
+    counts = np.bincount(_script_ids[slot[in_range]], minlength=len(SCRIPTS))
+    return {SCRIPTS[i]: int(count) for i, count in enumerate(counts) if count}
+
+def script_proportions(text):
+    """Return {script: share of the text's letters} for every script present"""
+    counts = script_counts(text)
+    total = sum(counts.values())
+    return {script: count / total for script, count in counts.items()} if total else {}
+
+def dominant_script(text):
+    """Return the script with the most letters, or None if the text has none"""
+    counts = script_counts(text)
+    return max(counts, key=counts.get) if counts else None
+
+def is_script(text, script, threshold=0.5):
+    """True if at least `threshold` of the text's letters are in `script`"""
+    return script_proportions(text).get(script, 0.0) >= threshold
@@ -1,9 +1,10 @@
-import os
-import json
 import uuid
 import logging
+import threading
+from collections import OrderedDict, deque
 from datetime import datetime
 from pathlib import Path
+from utils.session_store import SQLiteSessionStore
 
 # Setup basic logger if not already set
 logger = logging.getLogger('medical_app')
@@ -20,6 +21,17 @@ if not logger.handlers:
 # Directory to store chat history
 CHAT_HISTORY_DIR = Path("chat_sessions")
 CHAT_HISTORY_DIR.mkdir(exist_ok=True)
+SESSION_DB_PATH = CHAT_HISTORY_DIR / "sessions.db"
+
+# Formatted history cache: number of sessions kept and inputs kept per session
+HISTORY_CACHE_SESSIONS = 1024
+HISTORY_CACHE_DEPTH = 50
+# Loads retried when saves keep racing them; after that the fresh read is served uncached
+HISTORY_CACHE_LOAD_ATTEMPTS = 3
+
+# Legacy per-session JSON files are imported into the store on first start
+_store = SQLiteSessionStore(SESSION_DB_PATH, legacy_dir=CHAT_HISTORY_DIR)
+
 def create_new_session():
     """Create a new session ID"""
     session_id = str(uuid.uuid4())
@@ -29,13 +41,14 @@ def create_new_session():
 def delete_session(session_id):
     """Delete a chat session"""
     try:
-        session_file = CHAT_HISTORY_DIR / f"{session_id}.json"
-        if session_file.exists():
-            session_file.unlink()
+        deleted = _store.delete(session_id)
+        # Discard after the delete so a concurrent load can't re-cache the deleted history
+        _history_cache.discard(session_id)
+        if deleted:
             logger.info(f"Deleted session: {session_id}")
             return True
         else:
-            logger.warning(f"Session file not found for deletion: {session_id}")
+            logger.warning(f"Session not found for deletion: {session_id}")
             return False
     except Exception as e:
         logger.error(f"Error deleting session {session_id}: {e}")
@@ -44,48 +57,24 @@ def delete_session(session_id):
 def get_all_sessions():
     """Get all chat sessions"""
     try:
-        sessions = []
-        for session_file in CHAT_HISTORY_DIR.glob("*.json"):
-            try:
-                with open(session_file, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-                
-                session_info = {
-                    "session_id": session_data.get("session_id"),
-                    "created_at": session_data.get("created_at"),
-                    "last_updated": session_data.get("last_updated"),
-                    "input_count": len(session_data.get("user_inputs", [])),
-                    "last_input_time": session_data.get("user_inputs", [{}])[-1].get("timestamp") if session_data.get("user_inputs") else None
-                }
-                sessions.append(session_info)
-                
-            except Exception as e:
-                logger.error(f"Error reading session file {session_file}: {e}")
-                continue
-        
-        # Sort by last_updated
-        sessions.sort(key=lambda x: x.get("last_updated", ""), reverse=True)
+        sessions, _ = _store.list_sessions()
         return sessions
-        
     except Exception as e:
         logger.error(f"Error getting all sessions: {e}")
         return []
+
+def get_sessions_page(limit=50, cursor=None):
+    """
+    Get one page of chat sessions, most recently updated first.
+    Returns (sessions, next_cursor); next_cursor is None on the last page.
+    Raises ValueError for a malformed cursor.
+    """
+    return _store.list_sessions(limit=limit, cursor=cursor)
     
 def save_user_input(session_id, message, message_type='text', file_name=None, 
                    extracted_text=None, input_language='en'):
-    """Save only user input to file-based storage"""
+    """Append a user input to the session store"""
     try:
-        session_file = CHAT_HISTORY_DIR / f"{session_id}.json"
-        
-        # Load existing session data or create new
-        session_data = {"session_id": session_id, "user_inputs": []}
-        if session_file.exists():
-            try:
-                with open(session_file, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-            except (json.JSONDecodeError, Exception) as e:
-                logger.error(f"Error loading session file {session_file}: {e}")
-        
         # Create new input entry
         input_entry = {
             "message_id": str(uuid.uuid4()),
@@ -101,17 +90,8 @@ def save_user_input(session_id, message, message_type='text', file_name=None,
         if extracted_text:
             input_entry["extracted_text"] = extracted_text
         
-        # Add to session data
-        session_data["user_inputs"].append(input_entry)
-        session_data["last_updated"] = datetime.now().isoformat()
-        
-        # Create session metadata if not exists
-        if "created_at" not in session_data:
-            session_data["created_at"] = datetime.now().isoformat()
-        
-        # Save to file
-        with open(session_file, 'w', encoding='utf-8') as f:
-            json.dump(session_data, f, indent=2, ensure_ascii=False)
+        _store.append(session_id, input_entry)
+        _history_cache.append(session_id, input_entry)
         
         logger.info(f"Saved user input for session {session_id}: {message_type}")
         return input_entry["message_id"]
@@ -123,76 +103,174 @@ def save_user_input(session_id, message, message_type='text', file_name=None,
 def get_user_inputs(session_id, limit=50):
     """Get user input history for a session"""
     try:
-        session_file = CHAT_HISTORY_DIR / f"{session_id}.json"
-        
-        if not session_file.exists():
-            logger.warning(f"Session file not found: {session_id}")
-            return []
-        
-        with open(session_file, 'r', encoding='utf-8') as f:
-            session_data = json.load(f)
-        
-        inputs = session_data.get("user_inputs", [])
-        # Return last 'limit' inputs
-        return inputs[-limit:] if len(inputs) > limit else inputs
+        cached = _history_cache.recent(session_id, limit)
+        if cached is not None:
+            return [dict(entry) for entry, _ in cached]
+
+        inputs = _store.recent(session_id, limit)
+        if not inputs:
+            logger.warning(f"Session not found: {session_id}")
+        return inputs
         
     except Exception as e:
         logger.error(f"Error getting user inputs for session {session_id}: {e}")
         return []
 
+def _format_input(input_item):
+    """Render one user input as a context fragment"""
+    timestamp = input_item.get('timestamp', '')
+    message = input_item.get('message', '')
+    message_type = input_item.get('message_type', 'text')
+    
+    # Format timestamp to be more readable
+    try:
+        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        formatted_time = dt.strftime('%Y-%m-%d %H:%M')
+    except:
+        formatted_time = timestamp
+    
+    # Format based on message type
+    if message_type == 'file':
+        file_name = input_item.get('file_name', 'Unknown file')
+        extracted_text = input_item.get('extracted_text', '')
+        if extracted_text:
+            # Truncate extracted text for context
+            text_preview = extracted_text[:300] + "..." if len(extracted_text) > 300 else extracted_text
+            return f"[{formatted_time}] User uploaded '{file_name}' and asked: {message}\nFile content: {text_preview}\n\n"
+        else:
+            return f"[{formatted_time}] User uploaded '{file_name}' and asked: {message}\n\n"
+    elif message_type == 'voice':
+        return f"[{formatted_time}] User said (voice): {message}\n\n"
+    else:
+        return f"[{formatted_time}] User: {message}\n\n"
+
+class _HistoryCache:
+    """
+    LRU cache of the most recent (entry, rendered fragment) pairs per session.
+
+    save_user_input appends to a cached session instead of invalidating it, so
+    building prompt context is a slice-and-join with no store access. A load that
+    races a save is discarded and retried rather than installed stale. The cache
+    is per process; sessions written by other processes are not seen until evicted.
+    """
+
+    def __init__(self, max_sessions=HISTORY_CACHE_SESSIONS, depth=HISTORY_CACHE_DEPTH):
+        self.max_sessions = max_sessions
+        self.depth = depth
+        self._sessions = OrderedDict()
+        # Sessions being read from the store: loader count and append generation
+        self._loading = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def recent(self, session_id, limit):
+        """Return the last `limit` cached pairs, loading the session on a miss, or None if limit exceeds depth"""
+        if limit > self.depth:
+            return None
+        with self._lock:
+            items = self._sessions.get(session_id)
+            if items is not None:
+                self._sessions.move_to_end(session_id)
+                self.hits += 1
+                return list(items)[-limit:] if limit > 0 else []
+            self.misses += 1
+        for _ in range(HISTORY_CACHE_LOAD_ATTEMPTS):
+            items, installed = self._load(session_id)
+            if installed:
+                break
+        return list(items)[-limit:] if limit > 0 else []
+
+    def _load(self, session_id):
+        """
+        Read a session from the store and install it unless an append happened meanwhile.
+
+        A load is registered (with the session's append generation) before the store is
+        read, so a save that commits after the read bumps the generation and the stale
+        snapshot is not installed. Returns (items, installed).
+        """
+        with self._lock:
+            loading = self._loading.setdefault(session_id, {"loaders": 0, "generation": 0})
+            loading["loaders"] += 1
+            generation = loading["generation"]
+        try:
+            entries = _store.recent(session_id, self.depth)
+            items = deque(((entry, _format_input(entry)) for entry in entries), maxlen=self.depth)
+        except Exception:
+            with self._lock:
+                self._finish_load(session_id, loading)
+            raise
+        # The load stays registered until the install decision, so a save can't slip in between
+        with self._lock:
+            self._finish_load(session_id, loading)
+            cached = self._sessions.get(session_id)
+            if cached is not None:
+                # Another loader installed it; appends keep that copy current
+                self._sessions.move_to_end(session_id)
+                return cached, True
+            if loading["generation"] != generation:
+                return items, False
+            if items:
+                self._sessions[session_id] = items
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            return items, True
+
+    def _finish_load(self, session_id, loading):
+        loading["loaders"] -= 1
+        if not loading["loaders"]:
+            self._loading.pop(session_id, None)
+
+    def _invalidate_loads(self, session_id):
+        loading = self._loading.get(session_id)
+        if loading is not None:
+            loading["generation"] += 1
+
+    def append(self, session_id, entry):
+        """Add a newly saved entry to a cached session, and invalidate loads in flight"""
+        with self._lock:
+            self._invalidate_loads(session_id)
+            items = self._sessions.get(session_id)
+            if items is not None and all(cached["message_id"] != entry["message_id"] for cached, _ in items):
+                items.append((entry, _format_input(entry)))
+
+    def discard(self, session_id):
+        """Drop a cached session, and invalidate loads in flight"""
+        with self._lock:
+            self._invalidate_loads(session_id)
+            self._sessions.pop(session_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+_history_cache = _HistoryCache()
+
+def history_cache_stats():
+    """Return hit/miss counters of the formatted history cache"""
+    return _history_cache.stats()
+
 def get_user_inputs_formatted(session_id, limit=8):
     """
     Get user input history for a session with better formatting for context.
     Returns formatted string ready to be used as context.
     """
     try:
-        session_file = CHAT_HISTORY_DIR / f"{session_id}.json"
-        
-        if not session_file.exists():
-            logger.warning(f"Session file not found: {session_id}")
-            return ""
-        
-        with open(session_file, 'r', encoding='utf-8') as f:
-            session_data = json.load(f)
-        
-        inputs = session_data.get("user_inputs", [])
-        # Get last 'limit' inputs
-        recent_inputs = inputs[-limit:] if len(inputs) > limit else inputs
+        cached = _history_cache.recent(session_id, limit)
+        if cached is not None:
+            fragments = [fragment for _, fragment in cached]
+        else:
+            fragments = [_format_input(item) for item in _store.recent(session_id, limit)]
         
-        if not recent_inputs:
+        if not fragments:
             return ""
         
-        formatted_context = "Previous conversation history:\n"
-        for input_item in recent_inputs:
-            timestamp = input_item.get('timestamp', '')
-            message = input_item.get('message', '')
-            message_type = input_item.get('message_type', 'text')
-            
-            # Format timestamp to be more readable
-            try:
-                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                formatted_time = dt.strftime('%Y-%m-%d %H:%M')
-            except:
-                formatted_time = timestamp
-            
-            # Format based on message type
-            if message_type == 'file':
-                file_name = input_item.get('file_name', 'Unknown file')
-                extracted_text = input_item.get('extracted_text', '')
-                if extracted_text:
-                    # Truncate extracted text for context
-                    text_preview = extracted_text[:300] + "..." if len(extracted_text) > 300 else extracted_text
-                    formatted_context += f"[{formatted_time}] User uploaded '{file_name}' and asked: {message}\nFile content: {text_preview}\n\n"
-                else:
-                    formatted_context += f"[{formatted_time}] User uploaded '{file_name}' and asked: {message}\n\n"
-            elif message_type == 'voice':
-                formatted_context += f"[{formatted_time}] User said (voice): {message}\n\n"
-            else:
-                formatted_context += f"[{formatted_time}] User: {message}\n\n"
-        
-        formatted_context += "---\n\n"
-        return formatted_context
+        return "Previous conversation history:\n" + "".join(fragments) + "---\n\n"
         
     except Exception as e:
         logger.error(f"Error getting formatted user inputs for session {session_id}: {e}")
-        return ""
\ No newline at end of file
+        return ""
@@ -0,0 +1,212 @@
+import json
+import base64
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger('medical_app')
+
+def _encode_cursor(last_updated, session_id):
+    raw = json.dumps([last_updated, session_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def _decode_cursor(cursor):
+    try:
+        last_updated, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return last_updated, session_id
+    except Exception:
+        raise ValueError(f"Invalid session cursor: {cursor}")
+
+class SQLiteSessionStore:
+    """
+    SQLite (WAL mode) backend for chat session user inputs.
+
+    Every input is one appended row, so saving a message costs the same no matter
+    how long the session is, and reading the last N inputs is an indexed range
+    scan instead of parsing the whole session. Each thread gets its own
+    connection; SQLite serializes concurrent writers.
+    """
+
+    def __init__(self, db_path, legacy_dir=None):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        self._init_schema()
+        if legacy_dir is not None:
+            self.import_legacy_json(legacy_dir)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS user_inputs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                message_id TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                entry TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_user_inputs_session ON user_inputs(session_id, id);
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                last_updated TEXT NOT NULL
+            );
+        """)
+        # Summary columns maintained on every append so listing never scans user_inputs.
+        # Added and backfilled in one transaction, each column checked on its own, so an
+        # interrupted migration is completed on the next start.
+        summary_columns = {
+            "input_count": "INTEGER NOT NULL DEFAULT 0",
+            "last_input_time": "TEXT",
+        }
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            missing = [name for name in summary_columns if name not in columns]
+            for name in missing:
+                conn.execute(f"ALTER TABLE sessions ADD COLUMN {name} {summary_columns[name]}")
+            if missing:
+                conn.execute("""
+                    UPDATE sessions SET
+                        input_count = (SELECT COUNT(*) FROM user_inputs u WHERE u.session_id = sessions.session_id),
+                        last_input_time = (SELECT MAX(timestamp) FROM user_inputs u WHERE u.session_id = sessions.session_id)
+                """)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_recent ON sessions(last_updated DESC, session_id DESC)")
+
+    def append(self, session_id, entry):
+        """Append one user input entry to a session"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO user_inputs (session_id, message_id, timestamp, entry) VALUES (?, ?, ?, ?)",
+                (session_id, entry["message_id"], entry["timestamp"], json.dumps(entry, ensure_ascii=False)),
+            )
+            conn.execute(
+                "INSERT INTO sessions (session_id, created_at, last_updated, input_count, last_input_time) "
+                "VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET last_updated = excluded.last_updated, "
+                "input_count = input_count + 1, last_input_time = excluded.last_input_time",
+                (session_id, entry["timestamp"], entry["timestamp"], entry["timestamp"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def exists(self, session_id):
+        row = self._connect().execute(
+            "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row is not None
+
+    def recent(self, session_id, limit=50):
+        """Return the last `limit` entries of a session in chronological order"""
+        rows = self._connect().execute(
+            "SELECT entry FROM user_inputs WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+            (session_id, limit),
+        ).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def delete(self, session_id):
+        """Delete a session and its inputs, returning whether it existed"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM user_inputs WHERE session_id = ?", (session_id,))
+            deleted = conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return deleted > 0
+
+    def list_sessions(self, limit=None, cursor=None):
+        """
+        Return session summaries, most recently updated first.
+
+        Pages are keyset-paginated on (last_updated, session_id): pass the returned
+        cursor back to continue after the last row of the previous page.
+        Returns (sessions, next_cursor); next_cursor is None on the last page.
+        """
+        query = "SELECT session_id, created_at, last_updated, input_count, last_input_time FROM sessions"
+        params = []
+        if cursor:
+            last_updated, session_id = _decode_cursor(cursor)
+            query += " WHERE (last_updated, session_id) < (?, ?)"
+            params += [last_updated, session_id]
+        query += " ORDER BY last_updated DESC, session_id DESC"
+        if limit is not None:
+            # Fetch one extra row to know whether another page exists
+            query += " LIMIT ?"
+            params.append(limit + 1)
+        rows = self._connect().execute(query, params).fetchall()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1][2], rows[-1][0])
+
+        sessions = [
+            {
+                "session_id": session_id,
+                "created_at": created_at,
+                "last_updated": last_updated,
+                "input_count": input_count,
+                "last_input_time": last_input_time,
+            }
+            for session_id, created_at, last_updated, input_count, last_input_time in rows
+        ]
+        return sessions, next_cursor
+
+    def import_legacy_json(self, legacy_dir):
+        """Import whole-file JSON sessions once, renaming each imported file to *.json.migrated"""
+        for session_file in Path(legacy_dir).glob("*.json"):
+            try:
+                with open(session_file, 'r', encoding='utf-8') as f:
+                    session_data = json.load(f)
+                session_id = session_data.get("session_id") or session_file.stem
+                inputs = session_data.get("user_inputs", [])
+                if inputs and not self.exists(session_id):
+                    conn = self._connect()
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        conn.executemany(
+                            "INSERT INTO user_inputs (session_id, message_id, timestamp, entry) VALUES (?, ?, ?, ?)",
+                            [
+                                (session_id, entry.get("message_id", ""), entry.get("timestamp", ""),
+                                 json.dumps(entry, ensure_ascii=False))
+                                for entry in inputs
+                            ],
+                        )
+                        conn.execute(
+                            "INSERT INTO sessions (session_id, created_at, last_updated, input_count, last_input_time) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (session_id,
+                             session_data.get("created_at") or inputs[0].get("timestamp", ""),
+                             session_data.get("last_updated") or inputs[-1].get("timestamp", ""),
+                             len(inputs),
+                             inputs[-1].get("timestamp")),
+                        )
+                        conn.execute("COMMIT")
+                    except Exception:
+                        conn.execute("ROLLBACK")
+                        raise
+                session_file.rename(session_file.with_name(session_file.name + ".migrated"))
+                logger.info(f"Migrated legacy session file {session_file}")
+            except Exception as e:
+                logger.error(f"Error migrating session file {session_file}: {e}")
@@ -0,0 +1,161 @@
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
+import numpy as np
+from utils.vad import detect_speech
+
+STREAM_SAMPLE_RATE = 16000
+# Re-decode the window once this much new audio has arrived
+STREAM_STEP_S = float(os.getenv("STREAM_STEP_S", "1.0"))
+# Once the window grows past this, all but the last segment is committed and dropped
+STREAM_WINDOW_S = float(os.getenv("STREAM_WINDOW_S", "15"))
+# Trailing silence that ends an utterance
+STREAM_ENDPOINT_S = float(os.getenv("STREAM_ENDPOINT_S", "0.8"))
+STREAM_TTL = 300
+STREAM_MAX_STREAMS = 64
+
+class StreamingTranscriber:
+    """
+    Incremental transcription of 16 kHz mono PCM16 frames with a sliding window.
+
+    Audio accumulates in a window that is re-decoded every STREAM_STEP_S seconds of
+    new audio, giving a partial transcript. Text is committed (and its audio
+    dropped from the window) when the window grows past STREAM_WINDOW_S or the
+    speaker pauses for STREAM_ENDPOINT_S, so decode cost stays bounded however
+    long the stream runs; audio older than STREAM_WINDOW_S is dropped even if
+    nothing could be committed from it. Committed text is passed as the prompt for the next
+    window to keep wording consistent across boundaries.
+    """
+
+    def __init__(self, transcribe_segments, sample_rate=STREAM_SAMPLE_RATE):
+        """
+        Args:
+            transcribe_segments: (float32 samples, initial_prompt) -> list of
+                {"start", "end", "text"} dicts
+        """
+        self.transcribe_segments = transcribe_segments
+        self.sample_rate = sample_rate
+        self.window = np.zeros(0, dtype=np.int16)
+        self.committed = []
+        self.partial = ""
+        self.speech_ended = False
+        self.updated_at = time.time()
+        self._undecoded = 0
+        self._lock = threading.Lock()
+
+    def _decode(self):
+        audio = self.window.astype(np.float32) / 32768.0
+        prompt = " ".join(self.committed[-3:]) or None
+        self._undecoded = 0
+        return self.transcribe_segments(audio, prompt)
+
+    def _commit(self, segments, keep_last):
+        """Commit decoded segments (all, or all but the last) and drop their audio"""
+        done = segments[:-1] if keep_last else segments
+        if not done:
+            return segments
+        self.committed.extend(segment["text"].strip() for segment in done if segment["text"].strip())
+        cut = len(self.window) if not keep_last else int(done[-1]["end"] * self.sample_rate)
+        self.window = self.window[cut:]
+        return segments[len(done):]
+
+    def add(self, pcm):
+        """Append raw PCM16 bytes; returns the current state"""
+        with self._lock:
+            frames = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype=np.int16)
+            self.window = np.concatenate([self.window, frames])
+            self._undecoded += len(frames)
+            self.updated_at = time.time()
+            if self._undecoded < STREAM_STEP_S * self.sample_rate:
+                return self._state()
+
+            speech = detect_speech(self.window, self.sample_rate)
+            if not speech:
+                # Nothing but silence in the window; keep only a short tail of it.
+                # Text still shown as partial has no audio left behind it, so it is final.
+                self.window = self.window[-int(STREAM_ENDPOINT_S * self.sample_rate):]
+                self._undecoded = 0
+                if self.partial:
+                    self.committed.append(self.partial)
+                    self.partial = ""
+                self.speech_ended = bool(self.committed)
+                return self._state()
+
+            segments = self._decode()
+            self.speech_ended = len(self.window) - speech[-1][1] >= STREAM_ENDPOINT_S * self.sample_rate
+            if self.speech_ended:
+                segments = self._commit(segments, keep_last=False)
+            elif len(self.window) > STREAM_WINDOW_S * self.sample_rate:
+                remaining = self._commit(segments, keep_last=True)
+                # A single segment spanning the window cannot be split; commit it rather than lose it below
+                segments = remaining if len(remaining) < len(segments) else self._commit(segments, keep_last=False)
+            self.partial = "".join(segment["text"] for segment in segments).strip()
+            # Bound the window even when decoding produced no text to commit
+            self.window = self.window[-int(STREAM_WINDOW_S * self.sample_rate):]
+            return self._state()
+
+    def finish(self):
+        """Decode whatever is left and return the final state"""
+        with self._lock:
+            if len(self.window) and detect_speech(self.window, self.sample_rate):
+                self._commit(self._decode(), keep_last=False)
+            self.window = self.window[:0]
+            self.partial = ""
+            self.speech_ended = True
+            return self._state()
+
+    def _state(self):
+        text = " ".join(self.committed)
+        return {
+            "committed": text,
+            "partial": self.partial,
+            "transcript": f"{text} {self.partial}".strip(),
+            "speech_ended": self.speech_ended,
+        }
+
+class _Streams:
+    """Open streaming sessions by id, expiring idle ones"""
+
+    def __init__(self, ttl=STREAM_TTL, max_streams=STREAM_MAX_STREAMS):
+        self.ttl = ttl
+        self.max_streams = max_streams
+        self._streams = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, transcribe_segments):
+        stream_id = str(uuid.uuid4())
+        with self._lock:
+            self._evict()
+            if len(self._streams) >= self.max_streams:
+                raise RuntimeError("Too many open transcription streams")
+            self._streams[stream_id] = StreamingTranscriber(transcribe_segments)
+        return stream_id
+
+    def get(self, stream_id):
+        with self._lock:
+            self._evict()
+            return self._streams.get(stream_id)
+
+    def close(self, stream_id):
+        with self._lock:
+            return self._streams.pop(stream_id, None)
+
+    def _evict(self):
+        cutoff = time.time() - self.ttl
+        for stream_id in [i for i, stream in self._streams.items() if stream.updated_at < cutoff]:
+            del self._streams[stream_id]
+
+_streams = _Streams()
+
+def open_stream(transcribe_segments):
+    """Start a streaming transcription session and return its id"""
+    return _streams.open(transcribe_segments)
+
+def get_stream(stream_id):
+    return _streams.get(stream_id)
+
+def close_stream(stream_id):
+    """Remove a session and return it (None if unknown or expired)"""
+    return _streams.close(stream_id)
@@ -0,0 +1,50 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from utils.vad import split_segments
+
+logger = logging.getLogger('medical_app')
+
+# Speech longer than this is split and transcribed in parallel
+PARALLEL_STT_MIN_S = float(os.getenv("PARALLEL_STT_MIN_S", "60"))
+PARALLEL_STT_CHUNK_S = float(os.getenv("PARALLEL_STT_CHUNK_S", "30"))
+PARALLEL_STT_WORKERS = int(os.getenv("PARALLEL_STT_WORKERS", "4"))
+
+def transcribe_chunked(samples, transcribe_chunk, sample_rate=16000,
+                       max_segment_s=PARALLEL_STT_CHUNK_S, workers=PARALLEL_STT_WORKERS, segments=None):
+    """
+    Transcribe long audio as independent chunks on a worker pool.
+
+    The audio is split at pauses into chunks of at most `max_segment_s` seconds
+    (silence between chunks is skipped), chunks are transcribed concurrently and
+    the results are reassembled in order with timestamps relative to the full
+    recording.
+
+    Args:
+        samples: Mono PCM samples
+        transcribe_chunk: Chunk samples -> list of {"start", "end", "text"} dicts,
+            with times in seconds relative to the chunk
+        workers: Number of chunks transcribed at once
+        segments: Speech segments already detected in `samples`, to skip running VAD again
+
+    Returns:
+        {"text": full transcript, "segments": list of {"start", "end", "text"}}
+    """
+    chunks = split_segments(samples, sample_rate, max_segment_s, segments=segments)
+    started_at = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="stt-chunk") as executor:
+        results = list(executor.map(lambda chunk: transcribe_chunk(samples[chunk[0]:chunk[1]]), chunks))
+
+    segments = []
+    for (start, _), chunk_segments in zip(chunks, results):
+        offset = start / sample_rate
+        for segment in chunk_segments:
+            segments.append({
+                "start": round(offset + segment["start"], 2),
+                "end": round(offset + segment["end"], 2),
+                "text": segment["text"].strip(),
+            })
+    logger.info(f"Transcribed {len(samples) / sample_rate:.1f}s of audio as {len(chunks)} chunks "
+                f"with {workers} workers in {time.time() - started_at:.1f}s")
+    return {"text": " ".join(segment["text"] for segment in segments if segment["text"]), "segments": segments}
@@ -0,0 +1,125 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger('medical_app')
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+class AudioCache:
+    """
+    Content-addressed disk cache for synthesized audio, bounded by total size.
+
+    Each entry is one file named after the hash of (text, voice_id, engine, format),
+    so identical requests from any process share it. Eviction is least recently
+    used, tracked in memory and seeded from file modification times on startup.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes = OrderedDict()
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        files = [(path.stat(), path.name) for path in self.directory.glob("*.audio")]
+        for stat, name in sorted(files, key=lambda item: item[0].st_mtime):
+            self._sizes[name] = stat.st_size
+            self._total += stat.st_size
+        self._evict()
+
+    @staticmethod
+    def key(text, voice_id, engine, audio_format):
+        text_hash = hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{text_hash}|{voice_id}|{engine}|{audio_format}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        name = f"{key}.audio"
+        try:
+            with open(self.directory / name, 'rb') as f:
+                audio = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._sizes.pop(name, None)
+                self.misses += 1
+            return None
+        try:
+            # Touch the file so the LRU order survives restarts
+            os.utime(self.directory / name)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self.hits += 1
+            if name in self._sizes:
+                self._sizes.move_to_end(name)
+            else:
+                self._sizes[name] = len(audio)
+                self._total += len(audio)
+        return audio
+
+    def set(self, key, audio):
+        if len(audio) > self.max_bytes:
+            return
+        name = f"{key}.audio"
+        tmp_path = self.directory / f"{key}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(audio)
+        os.replace(tmp_path, self.directory / name)
+        with self._lock:
+            self._total += len(audio) - self._sizes.pop(name, 0)
+            self._sizes[name] = len(audio)
+            self._evict()
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._sizes:
+            name, size = self._sizes.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self.directory / name)
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._sizes),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_tts_cache():
+    """Return the process-wide audio cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AudioCache()
+        return _cache
+
+def cached_synthesis(text, voice_id, engine, audio_format, synthesize):
+    """Return cached audio for this text/voice/engine/format, calling synthesize(text) on a miss"""
+    cache = get_tts_cache()
+    key = cache.key(text, voice_id, engine, audio_format)
+    audio = cache.get(key)
+    if audio is None:
+        audio = synthesize(text)
+        try:
+            cache.set(key, audio)
+        except OSError as e:
+            logger.warning(f"Could not write TTS cache entry: {e}")
+    return audio
+
+def tts_cache_stats():
+    return get_tts_cache().stats()
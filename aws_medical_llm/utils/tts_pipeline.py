@@ -0,0 +1,56 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from utils.language import SENTENCE_END
+
+# Polly accepts up to 3000 characters per request; stay well below it
+MAX_CHUNK_CHARS = 1500
+# Sentences are merged until a chunk reaches this size, to avoid many tiny requests
+MIN_CHUNK_CHARS = 200
+
+def split_sentences(text, max_chars=MAX_CHUNK_CHARS, min_chars=MIN_CHUNK_CHARS):
+    """
+    Split text into synthesis chunks at sentence boundaries.
+
+    The first sentence is always its own chunk so the first audio is ready as soon
+    as possible; later sentences are merged up to `min_chars`. Sentences longer than
+    `max_chars` are split at the last space that fits.
+    """
+    sentences = []
+    for sentence in SENTENCE_END.split(text.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            sentences.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence.strip():
+            sentences.append(sentence)
+
+    chunks = []
+    for sentence in sentences:
+        if len(chunks) > 1 and len(chunks[-1]) < min_chars and len(chunks[-1]) + len(sentence) + 1 <= max_chars:
+            chunks[-1] = f"{chunks[-1]} {sentence}"
+        else:
+            chunks.append(sentence)
+    return chunks
+
+def ordered_pipeline(items, fn, workers=4, lookahead=None):
+    """
+    Apply fn to items on a worker pool and yield the results in input order.
+
+    Up to `lookahead` items are in flight ahead of the consumer, so synthesis of
+    later chunks overlaps with sending/playing earlier ones. With workers=1 this is
+    a single producer thread feeding the consumer.
+    """
+    lookahead = lookahead or workers * 2
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-chunk")
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= lookahead:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Consumer stopped early (e.g. client disconnected): drop queued work
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,166 @@
+import os
+import threading
+import numpy as np
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+VAD_FRAME_MS = 30
+# Frames this many dB above the recording's noise floor count as speech
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "12"))
+# ...but never frames quieter than this absolute level
+VAD_MIN_DBFS = -55.0
+VAD_MIN_SPEECH_MS = 200
+VAD_MIN_SILENCE_MS = 600  # shorter pauses stay inside a speech segment
+VAD_PAD_MS = 200
+# Silence inserted between joined segments so words do not run together
+VAD_JOIN_GAP_MS = 250
+
+def frame_energy_db(samples, sample_rate, frame_ms=VAD_FRAME_MS):
+    """Per-frame RMS level in dBFS of int16 or float samples, computed without a Python loop"""
+    frame = int(sample_rate * frame_ms / 1000)
+    count = len(samples) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:count * frame].reshape(count, frame).astype(np.float32)
+    if samples.dtype == np.int16:
+        frames /= 32768.0
+    rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame)
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+def _runs(mask):
+    """Return (start, end) index pairs of the True runs in a boolean array"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+def detect_speech(samples, sample_rate=16000, frame_ms=VAD_FRAME_MS, margin_db=VAD_MARGIN_DB,
+                  min_speech_ms=VAD_MIN_SPEECH_MS, min_silence_ms=VAD_MIN_SILENCE_MS, pad_ms=VAD_PAD_MS):
+    """
+    Energy-based voice activity detection.
+
+    The threshold adapts to the recording: the 10th percentile frame level is taken
+    as the noise floor and frames `margin_db` above it are speech (or `margin_db`
+    below the 90th percentile, for recordings with no quiet frames). Pauses shorter
+    than `min_silence_ms` are bridged, bursts shorter than `min_speech_ms` dropped
+    and every segment padded by `pad_ms`.
+
+    Returns:
+        List of (start, end) sample offsets of speech segments, in order
+    """
+    levels = frame_energy_db(samples, sample_rate, frame_ms)
+    if not len(levels):
+        return []
+    floor, loud = np.percentile(levels, [10, 90])
+    threshold = max(min(floor + margin_db, loud - margin_db), VAD_MIN_DBFS)
+    speech = levels > threshold
+
+    # Bridge short pauses, then drop short bursts
+    for start, end in _runs(~speech):
+        if start > 0 and end < len(speech) and (end - start) * frame_ms < min_silence_ms:
+            speech[start:end] = True
+    frame = int(sample_rate * frame_ms / 1000)
+    pad = int(sample_rate * pad_ms / 1000)
+    segments = []
+    for start, end in _runs(speech):
+        if (end - start) * frame_ms < min_speech_ms:
+            continue
+        start, end = max(0, start * frame - pad), min(len(samples), end * frame + pad)
+        if segments and start <= segments[-1][1]:
+            segments[-1] = (segments[-1][0], end)
+        else:
+            segments.append((start, end))
+    return segments
+
+def speech_segments(samples, sample_rate=16000, **kwargs):
+    """Return detected speech segments, or the whole recording as one segment when VAD is disabled"""
+    return detect_speech(samples, sample_rate, **kwargs) if VAD_ENABLED else [(0, len(samples))]
+
+def split_segments(samples, sample_rate=16000, max_segment_s=30.0, segments=None, **kwargs):
+    """
+    Split audio into speech chunks of at most `max_segment_s` seconds.
+
+    Chunks end at detected pauses: consecutive speech segments are grouped until
+    the next one would overflow the limit. A single segment longer than the limit
+    is cut at its quietest frame, repeatedly. `segments` from speech_segments()
+    may be passed to avoid detecting speech again.
+
+    Returns:
+        List of (start, end) sample offsets, in order
+    """
+    limit = int(max_segment_s * sample_rate)
+    if segments is None:
+        segments = speech_segments(samples, sample_rate, **kwargs)
+    pieces = []
+    for start, end in segments:
+        while end - start > limit:
+            # Cut in the second half of the window so pieces stay reasonably long
+            window = samples[start + limit // 2:start + limit]
+            levels = frame_energy_db(window, sample_rate)
+            frame = int(sample_rate * VAD_FRAME_MS / 1000)
+            cut = start + limit // 2 + (int(np.argmin(levels)) * frame if len(levels) else len(window))
+            pieces.append((start, cut))
+            start = cut
+        pieces.append((start, end))
+
+    chunks = []
+    for start, end in pieces:
+        if chunks and end - chunks[-1][0] <= limit:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+    return chunks
+
+class _VADStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.recordings = 0
+        self.input_s = 0.0
+        self.trimmed_s = 0.0
+
+    def add(self, input_s, trimmed_s):
+        with self._lock:
+            self.recordings += 1
+            self.input_s += input_s
+            self.trimmed_s += trimmed_s
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "enabled": VAD_ENABLED,
+                "recordings": self.recordings,
+                "input_s": round(self.input_s, 1),
+                "trimmed_s": round(self.trimmed_s, 1),
+                "trimmed_ratio": round(self.trimmed_s / self.input_s, 3) if self.input_s else None,
+            }
+
+_stats = _VADStats()
+
+def trim_silence(samples, sample_rate=16000, join_gap_ms=VAD_JOIN_GAP_MS, segments=None, **kwargs):
+    """
+    Remove leading/trailing silence and long pauses, using `segments` from
+    speech_segments() if given.
+
+    Returns:
+        (speech samples joined with short gaps, info dict with segments and seconds trimmed)
+    """
+    if segments is None:
+        segments = speech_segments(samples, sample_rate, **kwargs)
+    gap = np.zeros(int(sample_rate * join_gap_ms / 1000), dtype=samples.dtype)
+    parts = []
+    for i, (start, end) in enumerate(segments):
+        if i:
+            parts.append(gap)
+        parts.append(samples[start:end])
+    speech = np.concatenate(parts) if parts else samples[:0]
+
+    input_s = len(samples) / sample_rate
+    trimmed_s = max(0.0, input_s - len(speech) / sample_rate)
+    _stats.add(input_s, trimmed_s)
+    info = {
+        "input_s": round(input_s, 2),
+        "speech_s": round(len(speech) / sample_rate, 2),
+        "trimmed_s": round(trimmed_s, 2),
+        "segments": [(round(start / sample_rate, 2), round(end / sample_rate, 2)) for start, end in segments],
+    }
+    return speech, info
+
+def vad_stats():
+    return _stats.snapshot()
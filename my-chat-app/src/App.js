@@ -258,6 +258,93 @@ export default function App() {
     });
   };
 
+  // Label prefixed to answers for every mode the backend reports
+  const getModeIndicator = (mode) => {
+    switch (mode) {
+      case "offline":
+        return "🔒 Local LLM - ";
+      case "offline_with_rag":
+        return "🔒 Local RAG - ";
+      case "online_with_rag":
+        return "🌐 Online RAG - ";
+      case "online_no_rag":
+        return "🌐 Online - ";
+      case "file_extraction":
+        return "📄 File Analysis - ";
+      default:
+        return "";
+    }
+  };
+
+  // Read server-sent events from /ask_stream and render tokens as they arrive
+  const streamQuestion = async (question) => {
+    const response = await fetch("http://localhost:8000/ask_stream", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        question: question,
+        use_rag: !useLocalLLM,
+        session_id: sessionId || "",
+      }),
+    });
+
+    if (!response.ok || !response.body) {
+      const data = await response.json().catch(() => ({}));
+      throw new Error(data.error || `Request failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let modeIndicator = "";
+    let answer = "";
+    let finished = false;
+
+    while (!finished) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      const events = buffer.split("\n\n");
+      buffer = events.pop();
+      for (const rawEvent of events) {
+        let eventName = "message";
+        let eventData = "";
+        for (const line of rawEvent.split("\n")) {
+          if (line.startsWith("event: ")) eventName = line.slice(7);
+          else if (line.startsWith("data: ")) eventData += line.slice(6);
+        }
+        const payload = eventData ? JSON.parse(eventData) : {};
+
+        if (eventName === "meta") {
+          modeIndicator = getModeIndicator(payload.mode);
+          if (payload.session_id && payload.session_id !== sessionId) {
+            setSessionId(payload.session_id);
+          }
+        } else if (eventName === "token") {
+          if (!answer) {
+            setThinking(false);
+            setIsTyping(true);
+          }
+          answer += payload.text;
+          setCurrentTypingText(`${modeIndicator}${answer.replace(/^\s+/, "")}`);
+        } else if (eventName === "done") {
+          answer = payload.answer;
+          finished = true;
+        } else if (eventName === "error") {
+          answer = `❌ Error: ${payload.error}`;
+          modeIndicator = "";
+          finished = true;
+        }
+      }
+    }
+
+    setThinking(false);
+    setIsTyping(false);
+    setCurrentTypingText("");
+    setHistory((h) => [...h, { sender: "bot", message: `${modeIndicator}${answer.replace(/^\s+/, "")}` }]);
+  };
+
   const handleSubmit = async () => {
     if (!inputText.trim() && !selectedFile) return;
     
@@ -306,17 +393,9 @@ export default function App() {
           body: formData,
         });
       } else {
-        // Send text only
-        response = await fetch("http://localhost:8000/ask", {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({
-            question: currentText,
-            use_rag: !useLocalLLM,
-            voice: "Joanna",
-            session_id: sessionId || "",
-          }),
-        });
+        // Send text only and stream the answer
+        await streamQuestion(currentText);
+        return;
       }
 
       data = await response.json();
@@ -324,24 +403,8 @@ export default function App() {
       if (data.error) {
         await smoothTypeMessage(`❌ Error: ${data.error}`);
       } else {
-        // Show which mode was actually used - REDUCED SPACING HERE
-        let modeIndicator = "";
-        if (data.mode) {
-          switch (data.mode) {
-            case "offline":
-              modeIndicator = "🔒 Local LLM - ";
-              break;
-            case "online_with_rag":
-              modeIndicator = "🌐 Online RAG - ";
-              break;
-            case "online_no_rag":
-              modeIndicator = "🌐 Online - ";
-              break;
-            case "file_extraction":
-              modeIndicator = "📄 File Analysis - ";
-              break;
-          }
-        }
+        // Show which mode was actually used
+        const modeIndicator = getModeIndicator(data.mode);
         
         // Remove extra space - just concatenate directly
         await smoothTypeMessage(`${modeIndicator}${data.answer}`);
@@ -443,21 +506,8 @@ export default function App() {
           return newHist;
         });
 
-        // Show mode indicator for voice responses too - REDUCED SPACING HERE
-        let modeIndicator = "";
-        if (data.mode) {
-          switch (data.mode) {
-            case "offline":
-              modeIndicator = "🔒 Local LLM ";
-              break;
-            case "online_with_rag":
-              modeIndicator = "🌐 Online RAG ";
-              break;
-            case "online_no_rag":
-              modeIndicator = "🌐 Online ";
-              break;
-          }
-        }
+        // Show mode indicator for voice responses too
+        const modeIndicator = getModeIndicator(data.mode);
 
         // Remove extra space - just concatenate directly
         await smoothTypeMessage(`${modeIndicator}${data.answer || "(No answer)"}`);